@@ -2,26 +2,53 @@ from __future__ import annotations
 
 import os
 import re
-from typing import Literal, List, Optional, Dict, Any, Tuple
+from typing import Literal, List, Optional, Dict, Any, Tuple, AsyncIterator, Iterator
 
-import requests
-from openai import OpenAI
+import jiter
+from openai import AsyncOpenAI
 from pydantic import BaseModel, Field
-import sqlite3
+import asyncio
+import atexit
 import hashlib
 import json
+import threading
+import time
 import unicodedata
 
+from ai.cache import LRUCache
+from ai.feedback_codec import pack_feedback, signature_key, unpack_evaluation, unpack_feedback
+from ai.languagetool import CircuitBreaker, LanguageToolClient
+from db import get_corpus_version, get_db_connection, on_corpus_change
 
-client = OpenAI()
 
 Severity = Literal["error", "variant", "style"]
-DB_PATH = os.getenv("APP_DB_PATH", "data/app.db")
 MODEL_ID = "gpt-5-nano-2025-08-07"
 LT_ENDPOINT = os.getenv("LANGUAGETOOL_ENDPOINT", "https://api.languagetool.org/v2/check")
 LT_LANGUAGE = os.getenv("LANGUAGETOOL_LANGUAGE", "nb")  # Bokmål
 PROMPT_VERSION = "grading-v1.1"   # bump when you change prompts/rubric
 LT_VERSION = f"{LT_LANGUAGE}|{LT_ENDPOINT}|v1"
+GOLD_SHORT_RULE = "Godkjent: Svaret matcher en lagret fasit (bokmål)."
+GOLD_PUNCTUATION_SHORT_RULE = "Godkjent: Ordene matcher en lagret fasit; sammenlign tegnsettingen med forslaget."
+# How often (seconds) the gold index checks whether another process changed the corpus
+GOLD_INDEX_RECHECK_S = float(os.getenv("GOLD_INDEX_RECHECK_S", "30"))
+FEEDBACK_CACHE_SIZE = int(os.getenv("FEEDBACK_CACHE_SIZE", "5000"))
+FEEDBACK_CACHE_TTL_S = float(os.getenv("FEEDBACK_CACHE_TTL_S", "600"))
+HIT_FLUSH_INTERVAL_S = float(os.getenv("HIT_FLUSH_INTERVAL_S", "10"))
+# Retention for feedback rows: compact_feedback only touches rows older than this
+FEEDBACK_MAX_AGE_DAYS = int(os.getenv("FEEDBACK_MAX_AGE_DAYS", "90"))
+FEEDBACK_MIN_HITS = int(os.getenv("FEEDBACK_MIN_HITS", "2"))
+LT_MAX_CONNECTIONS = int(os.getenv("LANGUAGETOOL_MAX_CONNECTIONS", "50"))
+LT_TIMEOUT_S = float(os.getenv("LANGUAGETOOL_TIMEOUT_S", "4"))
+LT_BREAKER_FAILURES = int(os.getenv("LANGUAGETOOL_BREAKER_FAILURES", "3"))
+LT_BREAKER_COOLDOWN_S = float(os.getenv("LANGUAGETOOL_BREAKER_COOLDOWN_S", "30"))
+# Total time a submit may spend in evaluate_translation; LT only gets what the LLM can spare
+SUBMIT_BUDGET_S = float(os.getenv("SUBMIT_BUDGET_S", "40"))
+LLM_RESERVE_S = float(os.getenv("LLM_RESERVE_S", "20"))
+# Process-wide cap on grading calls in flight (all evaluations share one event loop)
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+LT_CACHE_SIZE = int(os.getenv("LANGUAGETOOL_CACHE_SIZE", "5000"))
+LT_CACHE_MAX_AGE_DAYS = int(os.getenv("LANGUAGETOOL_CACHE_MAX_AGE_DAYS", "30"))
+LT_PRUNE_INTERVAL_S = 3600.0
 
 
 class Issue(BaseModel):
@@ -44,19 +71,12 @@ class Evaluation(BaseModel):
     issues: List[Issue] = Field(default_factory=list, description="Maks 3 punkter.")
     short_rule: str = Field(..., description="Én setning med viktigste regel eller råd.")
 
-def _get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
-
 def get_valid_translations(sentence_id: int) -> List[str]:
-    conn = _get_db_connection()
+    conn = get_db_connection()
     rows = conn.execute(
         "SELECT translation FROM valid_translations WHERE sentence_id = ?",
         (sentence_id,),
     ).fetchall()
-    conn.close()
     return [r["translation"] for r in rows]
 
 
@@ -68,6 +88,9 @@ def _normalize_nb(s: str) -> str:
     - normalize curly quotes
     - remove trailing sentence punctuation (., !, ?)
     - lower-case
+
+    static/normalize.js mirrors this for the client-side gold check; keep both
+    in step with static/normalize_vectors.json (flask check-normalize-vectors).
     """
     s = (s or "").strip()
     s = s.replace("“", '"').replace("”", '"').replace("’", "'").replace("‘", "'")
@@ -79,21 +102,6 @@ def _normalize_nb(s: str) -> str:
     return s.lower()
 
 
-def check_against_gold(sentence_id: int, user_norwegian: str) -> Optional[str]:
-    """
-    Returns the matched gold translation (original stored string) if it matches,
-    else None.
-    """
-    gold = get_valid_translations(sentence_id)
-    if not gold:
-        return None
-
-    user_norm = _normalize_nb(user_norwegian)
-    for t in gold:
-        if _normalize_nb(t) == user_norm:
-            return t  # return the canonical stored form
-    return None
-
 def _normalize_cache_key(s: str) -> str:
     s = unicodedata.normalize("NFKC", (s or ""))
     s = s.strip().lower()
@@ -107,93 +115,762 @@ def _sha256_hex(s: str) -> str:
 def _make_signature(level: str, sentence_id: int, translation_hash: str) -> str:
     return f"{level}-{sentence_id}-{MODEL_ID}-{PROMPT_VERSION}-{translation_hash[:12]}-{LT_LANGUAGE}"
 
+# -------------------------
+# Feedback cache (in-process LRU in front of translation_feedback)
+# -------------------------
+
+# signature -> (Evaluation, feedback_id); cached evaluations are shared, treat as read-only
+_feedback_cache = LRUCache(FEEDBACK_CACHE_SIZE, FEEDBACK_CACHE_TTL_S)
+
+# feedback_id -> hits not yet written to translation_feedback.hit_count
+_pending_hits: Dict[int, int] = {}
+_hits_lock = threading.Lock()
+_hit_flusher: Optional[threading.Thread] = None
+
+
+def _record_hit(feedback_id: int) -> None:
+    global _hit_flusher
+    with _hits_lock:
+        _pending_hits[feedback_id] = _pending_hits.get(feedback_id, 0) + 1
+        if _hit_flusher is None:
+            _hit_flusher = threading.Thread(target=_hit_flush_loop, name="hit-count-flusher", daemon=True)
+            _hit_flusher.start()
+
+
+def flush_hit_counts() -> int:
+    """
+    Writes accumulated cache hits to translation_feedback in one transaction.
+    Returns the number of rows updated.
+    """
+    with _hits_lock:
+        if not _pending_hits:
+            return 0
+        batch = list(_pending_hits.items())
+        _pending_hits.clear()
+
+    try:
+        conn = get_db_connection()
+        conn.executemany(
+            "UPDATE translation_feedback SET hit_count = hit_count + ? WHERE id = ?",
+            [(n, feedback_id) for feedback_id, n in batch],
+        )
+        conn.commit()
+    except Exception:
+        # Put the counts back so the next flush retries them
+        with _hits_lock:
+            for feedback_id, n in batch:
+                _pending_hits[feedback_id] = _pending_hits.get(feedback_id, 0) + n
+        raise
+
+    return len(batch)
+
+
+def _hit_flush_loop() -> None:
+    while True:
+        time.sleep(HIT_FLUSH_INTERVAL_S)
+        try:
+            flush_hit_counts()
+        except Exception:
+            pass
+
+
+atexit.register(flush_hit_counts)
+
+
+def feedback_signature(level: str, sentence_id: int, user_norwegian: str) -> str:
+    """
+    Cache signature for an answer under the current MODEL_ID/PROMPT_VERSION.
+    """
+    return _make_signature(level, sentence_id, _sha256_hex(_normalize_cache_key(user_norwegian)))
+
+
+def feedback_cache_stats() -> Dict[str, Any]:
+    with _hits_lock:
+        pending = sum(_pending_hits.values())
+    return {**_feedback_cache.stats(), "pending_hit_writes": pending}
+
+
 def _cache_get(level: str, sentence_id: int, user_norwegian: str) -> Optional[Tuple[Evaluation, int]]:
     norm = _normalize_cache_key(user_norwegian)
     thash = _sha256_hex(norm)
     sig = _make_signature(level, sentence_id, thash)
 
-    conn = _get_db_connection()
+    cached = _feedback_cache.get(sig)
+    if cached is not None:
+        _record_hit(cached[1])
+        return cached
+
+    conn = get_db_connection()
     row = conn.execute(
         """
-        SELECT id, feedback_json
+        SELECT id, payload
         FROM translation_feedback
-        WHERE signature = ?
+        WHERE sig_key = ?
         """,
-        (sig,),
+        (signature_key(sig),),
     ).fetchone()
 
-    if row:
-        conn.execute(
-            "UPDATE translation_feedback SET hit_count = hit_count + 1 WHERE id = ?",
-            (row["id"],),
-        )
-        conn.commit()
-        conn.close()
+    if row is None:
+        return None
 
-        data = json.loads(row["feedback_json"])
-        ev = Evaluation.model_validate(data)
-        return ev, int(row["id"])
+    data, _ = unpack_feedback(row["payload"])
+    ev = Evaluation.model_validate(data)
+    feedback_id = int(row["id"])
 
-    conn.close()
-    return None
+    _feedback_cache.put(sig, (ev, feedback_id))
+    _record_hit(feedback_id)
+    return ev, feedback_id
 
 
 
-def _cache_put(level: str, sentence_id: int, user_norwegian: str, ev: Evaluation) -> int:
+def _insert_feedback(conn, level: str, sentence_id: int, user_norwegian: str, ev: Evaluation) -> Tuple[str, int]:
+    """
+    Writes (or finds) the translation_feedback row for an answer in the
+    caller's transaction. Returns (signature, feedback_id).
+    """
     norm = _normalize_cache_key(user_norwegian)
     thash = _sha256_hex(norm)
     sig = _make_signature(level, sentence_id, thash)
+    key = signature_key(sig)
 
-    conn = _get_db_connection()
-
-    conn.execute(
+    cur = conn.execute(
         """
         INSERT OR IGNORE INTO translation_feedback (
-            signature, level, sentence_id,
+            sig_key, level, sentence_id,
             model_id, prompt_version,
-            translation_norm, translation_hash,
-            verdict, feedback_json
+            translation_hash,
+            verdict, payload
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
-            sig, level, sentence_id,
+            key, level, sentence_id,
             MODEL_ID, PROMPT_VERSION,
-            norm, thash,
-            ev.verdict, json.dumps(ev.model_dump(), ensure_ascii=False),
+            bytes.fromhex(thash),
+            ev.verdict, pack_feedback(ev.model_dump(), norm),
         ),
     )
 
     row = conn.execute(
-        "SELECT id FROM translation_feedback WHERE signature = ?",
-        (sig,),
+        "SELECT id FROM translation_feedback WHERE sig_key = ?",
+        (key,),
     ).fetchone()
+    if row is None:
+        raise RuntimeError("Failed to read back translation_feedback after insert/ignore")
 
+    if cur.rowcount:
+        _insert_feedback_issues(conn, [(int(row["id"]), ev.model_dump())])
+    return sig, int(row["id"])
+
+
+def _cache_put(level: str, sentence_id: int, user_norwegian: str, ev: Evaluation) -> int:
+    conn = get_db_connection()
+    sig, feedback_id = _insert_feedback(conn, level, sentence_id, user_norwegian, ev)
     conn.commit()
-    conn.close()
 
-    if row is None:
-        raise RuntimeError("Failed to read back translation_feedback after insert/ignore")
+    _feedback_cache.put(sig, (ev, feedback_id))
+    return feedback_id
+
+
+def ensure_feedback_row(
+    conn,
+    level: str,
+    sentence_id: int,
+    user_norwegian: str,
+    ev: Evaluation,
+    feedback_id: int,
+) -> int:
+    """
+    feedback_id if its translation_feedback row still exists, else the id of a
+    fresh row for the same answer, written in the caller's transaction.
+    compact_feedback in another process may have evicted a row that is still
+    in this process's _feedback_cache; call this before referencing it, with
+    the write lock already held (BEGIN IMMEDIATE) so no eviction can commit
+    between the check and the reference.
+    """
+    if conn.execute("SELECT 1 FROM translation_feedback WHERE id = ?", (feedback_id,)).fetchone():
+        return feedback_id
+
+    sig, feedback_id = _insert_feedback(conn, level, sentence_id, user_norwegian, ev)
+    # Replaced once the caller commits; a rollback only costs one more lookup
+    _feedback_cache.put(sig, (ev, feedback_id))
+    return feedback_id
+
+# -------------------------
+# Feedback issue index
+# -------------------------
+
+def _insert_feedback_issues(conn, evaluations: List[Tuple[int, Dict[str, Any]]]) -> int:
+    """
+    Writes feedback_issues rows for (feedback_id, evaluation dict) pairs in the
+    caller's transaction. Returns how many issue rows were new.
+    """
+    rows = [
+        (feedback_id, position, str(issue.get("category") or ""), str(issue.get("severity") or ""))
+        for feedback_id, data in evaluations
+        for position, issue in enumerate(data.get("issues") or [])
+    ]
+    if not rows:
+        return 0
+    before = conn.total_changes
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO feedback_issues (feedback_id, position, category, severity)
+        VALUES (?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return conn.total_changes - before
+
+
+def backfill_feedback_issues(batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Indexes the issues of feedback rows written before migration 0006, in
+    short transactions. Resumable: progress is kept in app_meta.
+    Returns {"feedback_rows": n, "issues": n, "remaining": n}.
+    """
+    conn = get_db_connection()
+    meta = dict(conn.execute(
+        """
+        SELECT key, value FROM app_meta
+        WHERE key IN ('feedback_issues_backfill_cursor', 'feedback_issues_backfill_upto')
+        """
+    ).fetchall())
+    cursor = int(meta.get("feedback_issues_backfill_cursor", 0))
+    upto = int(meta.get("feedback_issues_backfill_upto", 0))
+
+    feedback_rows = issues = 0
+    while cursor < upto:
+        rows = conn.execute(
+            """
+            SELECT id, payload FROM translation_feedback
+            WHERE id > ? AND id <= ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (cursor, upto, batch_size),
+        ).fetchall()
+        cursor = int(rows[-1]["id"]) if rows else upto
+
+        issues += _insert_feedback_issues(conn, [(int(r["id"]), unpack_evaluation(r["payload"])) for r in rows])
+        conn.execute(
+            "UPDATE app_meta SET value = ? WHERE key = 'feedback_issues_backfill_cursor'",
+            (str(cursor),),
+        )
+        conn.commit()
+        feedback_rows += len(rows)
+
+    return {"feedback_rows": feedback_rows, "issues": issues, "remaining": max(upto - cursor, 0)}
+
+
+def weak_areas(
+    game_id: Optional[int] = None,
+    since_ts: Optional[int] = None,
+    until_ts: Optional[int] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Issue categories behind a game's (or a period's) attempts, most frequent
+    first: [{"category", "severity", "issues", "attempts"}].
+    """
+    where, params = [], []
+    if game_id is not None:
+        where.append("ta.game_id = ?")
+        params.append(game_id)
+    if since_ts is not None:
+        where.append("ta.created_ts >= ?")
+        params.append(since_ts)
+    if until_ts is not None:
+        where.append("ta.created_ts < ?")
+        params.append(until_ts)
+
+    rows = get_db_connection().execute(
+        f"""
+        SELECT fi.category, fi.severity, COUNT(*) AS issues, COUNT(DISTINCT ta.id) AS attempts
+        FROM translation_attempts ta
+        JOIN feedback_issues fi ON fi.feedback_id = ta.feedback_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        GROUP BY fi.category, fi.severity
+        ORDER BY issues DESC, fi.category
+        LIMIT ?
+        """,
+        (*params, limit),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+# -------------------------
+# Gold translation index
+# -------------------------
+
+GoldMatchKind = Literal["gold", "gold_punctuation", "unknown"]
+
+
+class _SentenceGold:
+    """
+    Gold forms for one sentence:
+      exact:  _normalize_nb form -> (canonical stored form, feedback_id)
+      tokens: word-token key (punctuation dropped) -> canonical stored form
+    """
+    __slots__ = ("exact", "tokens")
+
+    def __init__(self) -> None:
+        self.exact: Dict[str, Tuple[str, int]] = {}
+        self.tokens: Dict[str, str] = {}
+
+
+GoldIndex = Dict[int, _SentenceGold]
+
+_gold_lock = threading.Lock()
+_gold_index: Optional[GoldIndex] = None
+_gold_version: Optional[int] = None
+_gold_checked_at = 0.0
+
+
+def _gold_evaluation(canonical: str) -> Evaluation:
+    return Evaluation(
+        verdict="correct",
+        meaning="same",
+        corrected=canonical,
+        issues=[],
+        short_rule=GOLD_SHORT_RULE,
+    )
+
+
+def _gold_punctuation_evaluation(canonical: str) -> Evaluation:
+    return Evaluation(
+        verdict="correct",
+        meaning="same",
+        corrected=canonical,
+        issues=[
+            Issue(
+                category="tegnsetting",
+                severity="style",
+                explanation="Ordene og ordstillingen matcher fasiten, men tegnsettingen er litt annerledes.",
+                fix=canonical,
+            )
+        ],
+        short_rule=GOLD_PUNCTUATION_SHORT_RULE,
+    )
+
+
+def _token_key(s: str) -> str:
+    """
+    Word tokens of the _normalize_nb form joined by single spaces: commas,
+    quotes, dashes and spacing drop out, word order and spelling do not.
+    """
+    return " ".join(re.findall(r"\w+", _normalize_nb(s)))
+
+
+def _build_gold_index() -> Tuple[GoldIndex, int]:
+    """
+    Loads every valid translation once, and makes sure each one has a
+    translation_feedback row under the current MODEL_ID/PROMPT_VERSION, so a gold
+    hit can be answered without touching the DB.
+    """
+    conn = get_db_connection()
+    version = get_corpus_version(conn)
+    rows = conn.execute(
+        """
+        SELECT vt.sentence_id, vt.translation, s.level
+        FROM valid_translations vt
+        JOIN source_sentences s ON s.id = vt.sentence_id
+        ORDER BY vt.id
+        """
+    ).fetchall()
+
+    entries: List[Tuple[int, str, str]] = []
+    feedback_rows = []
+    for r in rows:
+        canonical = r["translation"]
+        norm = _normalize_cache_key(canonical)
+        thash = _sha256_hex(norm)
+        key = signature_key(_make_signature(r["level"], r["sentence_id"], thash))
+        entries.append((r["sentence_id"], canonical, key))
+        feedback_rows.append((
+            key, r["level"], r["sentence_id"],
+            MODEL_ID, PROMPT_VERSION,
+            bytes.fromhex(thash),
+            "correct", pack_feedback(_gold_evaluation(canonical).model_dump(), norm),
+        ))
+
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO translation_feedback (
+            sig_key, level, sentence_id,
+            model_id, prompt_version,
+            translation_hash,
+            verdict, payload
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        feedback_rows,
+    )
+
+    ids: Dict[int, int] = {}
+    keys = [key for _, _, key in entries]
+    for i in range(0, len(keys), 500):
+        chunk = keys[i : i + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"SELECT id, sig_key FROM translation_feedback WHERE sig_key IN ({placeholders})",
+            chunk,
+        ):
+            ids[row["sig_key"]] = int(row["id"])
+
+    conn.commit()
+
+    index: GoldIndex = {}
+    for sentence_id, canonical, key in entries:
+        gold = index.get(sentence_id)
+        if gold is None:
+            gold = index[sentence_id] = _SentenceGold()
+        # First stored form wins when two gold entries normalize identically
+        gold.exact.setdefault(_normalize_nb(canonical), (canonical, ids[key]))
+        gold.tokens.setdefault(_token_key(canonical), canonical)
+
+    return index, version
+
+
+def _get_gold_index() -> GoldIndex:
+    global _gold_index, _gold_version, _gold_checked_at
+
+    index = _gold_index
+    now = time.monotonic()
+    if index is not None and now - _gold_checked_at < GOLD_INDEX_RECHECK_S:
+        return index
+
+    with _gold_lock:
+        if _gold_index is not None and now - _gold_checked_at < GOLD_INDEX_RECHECK_S:
+            return _gold_index
+
+        if _gold_index is not None:
+            # Cheap cross-process staleness check (triggers bump corpus_version)
+            conn = get_db_connection()
+            version = get_corpus_version(conn)
+            if version == _gold_version:
+                _gold_checked_at = now
+                return _gold_index
+
+        _gold_index, _gold_version = _build_gold_index()
+        _gold_checked_at = time.monotonic()
+        return _gold_index
+
+
+@on_corpus_change
+def invalidate_gold_index() -> None:
+    global _gold_index, _gold_version
+    with _gold_lock:
+        _gold_index = None
+        _gold_version = None
+
+
+def check_against_gold(sentence_id: int, user_norwegian: str) -> Optional[Tuple[str, int]]:
+    """
+    Returns (canonical stored translation, feedback_id) if the answer matches a
+    gold translation, else None. Served from the in-memory gold index.
+    """
+    gold = _get_gold_index().get(sentence_id)
+    if gold is None:
+        return None
+    return gold.exact.get(_normalize_nb(user_norwegian))
+
+
+# Hex digits of each salted gold hash sent to the client (128 bits)
+GOLD_HASH_HEX_LEN = 32
+
+
+def gold_answer_hashes(sentence_id: int, salt: str) -> List[str]:
+    """
+    Salted SHA-256 prefixes of the sentence's _normalize_nb gold forms, so the
+    game page can recognise an exact gold answer without being sent the answers.
+    """
+    gold = _get_gold_index().get(sentence_id)
+    if gold is None:
+        return []
+    return [_sha256_hex(salt + norm)[:GOLD_HASH_HEX_LEN] for norm in gold.exact]
+
+
+def classify_against_gold(sentence_id: int, user_norwegian: str) -> Tuple[GoldMatchKind, Optional[str]]:
+    """
+    Classifies an answer against the stored translations:
+      - "gold": identical after _normalize_nb
+      - "gold_punctuation": same words in the same order, only punctuation/spacing differ
+      - "unknown": anything else (needs LanguageTool + LLM)
+    Returns (kind, canonical stored form or None).
+
+    Word-order permutations are deliberately not matched: a reordered sentence is
+    often exactly the V2 error we grade. Accepted alternative orders are matched
+    only when they are stored as their own valid translation.
+    """
+    gold = _get_gold_index().get(sentence_id)
+    if gold is None:
+        return "unknown", None
+
+    exact = gold.exact.get(_normalize_nb(user_norwegian))
+    if exact is not None:
+        return "gold", exact[0]
+
+    canonical = gold.tokens.get(_token_key(user_norwegian))
+    if canonical is not None:
+        return "gold_punctuation", canonical
+
+    return "unknown", None
+
+# -------------------------
+# Feedback retention
+# -------------------------
+
+def _gold_signature_keys(conn) -> List[int]:
+    """sig_keys of the gold feedback rows _build_gold_index maintains."""
+    rows = conn.execute(
+        """
+        SELECT vt.sentence_id, vt.translation, s.level
+        FROM valid_translations vt
+        JOIN source_sentences s ON s.id = vt.sentence_id
+        """
+    ).fetchall()
+    return [
+        signature_key(_make_signature(
+            r["level"], r["sentence_id"], _sha256_hex(_normalize_cache_key(r["translation"]))
+        ))
+        for r in rows
+    ]
+
+
+def compact_feedback(
+    max_age_days: int = FEEDBACK_MAX_AGE_DAYS,
+    min_hits: int = FEEDBACK_MIN_HITS,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Applies the translation_feedback retention policy, in short transactions,
+    to rows older than max_age_days only. "Other" versions include newer ones
+    (warm-cache fills them before a deploy), so age is what protects them:
+      - evicts rows no attempt references that are either from another
+        MODEL_ID/PROMPT_VERSION, or current with fewer than min_hits cache
+        hits (gold rows are always kept);
+      - archives referenced rows from other versions: the payload is re-packed
+        without the fields the history pages don't render or the answer text.
+    Returns {"evicted": n, "archived": n}.
+
+    Only this process's _feedback_cache is cleared. Other processes may still
+    hand out evicted feedback_ids until their entries expire; record_turn
+    re-creates such rows through ensure_feedback_row.
+    """
+    conn = get_db_connection()
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_sig_keys (sig_key INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.keep_sig_keys")
+    conn.executemany(
+        "INSERT OR IGNORE INTO temp.keep_sig_keys (sig_key) VALUES (?)",
+        [(key,) for key in _gold_signature_keys(conn)],
+    )
+
+    evictable = """
+        SELECT tf.id
+        FROM translation_feedback tf
+        WHERE NOT EXISTS (SELECT 1 FROM translation_attempts ta WHERE ta.feedback_id = tf.id)
+          AND tf.created_at < datetime('now', 'localtime', :max_age)
+          AND (
+                tf.model_id != :model_id OR tf.prompt_version != :prompt_version
+                OR (
+                    tf.hit_count < :min_hits
+                    AND tf.sig_key NOT IN (SELECT sig_key FROM temp.keep_sig_keys)
+                )
+          )
+    """
+    archivable = """
+        SELECT tf.id
+        FROM translation_feedback tf
+        WHERE tf.archived = 0
+          AND tf.created_at < datetime('now', 'localtime', :max_age)
+          AND (tf.model_id != :model_id OR tf.prompt_version != :prompt_version)
+    """
+    params = {
+        "model_id": MODEL_ID,
+        "prompt_version": PROMPT_VERSION,
+        "max_age": f"-{int(max_age_days)} days",
+        "min_hits": int(min_hits),
+        "limit": int(batch_size),
+    }
+
+    if dry_run:
+        evicted = conn.execute(f"SELECT COUNT(*) FROM ({evictable})", params).fetchone()[0]
+        archived = conn.execute(
+            f"SELECT COUNT(*) FROM ({archivable}) WHERE id NOT IN ({evictable})", params
+        ).fetchone()[0]
+        conn.rollback()
+        return {"evicted": evicted, "archived": archived}
+
+    evicted = 0
+    while True:
+        cur = conn.execute(
+            f"DELETE FROM translation_feedback WHERE id IN ({evictable} LIMIT :limit)", params
+        )
+        conn.commit()
+        evicted += cur.rowcount
+        if cur.rowcount < batch_size:
+            break
+
+    # Whatever is left from other versions is referenced by attempts
+    archived = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT id, payload FROM translation_feedback WHERE id IN ({archivable} LIMIT :limit)",
+            params,
+        ).fetchall()
+        slim = []
+        for row in rows:
+            data, _ = unpack_feedback(row["payload"])
+            data.pop("meaning", None)
+            slim.append((pack_feedback(data), row["id"]))
+        conn.executemany(
+            "UPDATE translation_feedback SET payload = ?, archived = 1 WHERE id = ?",
+            slim,
+        )
+        conn.commit()
+        archived += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    _feedback_cache.clear()
+    return {"evicted": evicted, "archived": archived}
 
-    return int(row["id"])
 
 # -------------------------
 # LanguageTool integration
 # -------------------------
 
 
-def _languagetool_check(text: str, timeout_s: float = 4.0) -> Dict[str, Any]:
+_lt_client = LanguageToolClient(
+    LT_ENDPOINT,
+    LT_LANGUAGE,
+    timeout_s=LT_TIMEOUT_S,
+    max_connections=LT_MAX_CONNECTIONS,
+    breaker=CircuitBreaker(LT_BREAKER_FAILURES, LT_BREAKER_COOLDOWN_S),
+)
+
+
+async def _languagetool_check(text: str, deadline: Optional[float] = None) -> Dict[str, Any]:
     """
-    Call LanguageTool /v2/check. Returns JSON response.
+    Call LanguageTool /v2/check via the shared keep-alive client. Returns JSON response.
+    Raises LanguageToolUnavailable when LT is skipped or fails.
     Set LANGUAGETOOL_ENDPOINT to self-hosted endpoint if needed.
     """
-    payload = {
-        "language": LT_LANGUAGE,
-        "text": text,
-    }
-    r = requests.post(LT_ENDPOINT, data=payload, timeout=timeout_s)
-    r.raise_for_status()
-    return r.json()
+    return await _lt_client.check(text, deadline=deadline)
+
+
+# -------------------------
+# LanguageTool result cache (in-process LRU in front of languagetool_results)
+# -------------------------
+
+# (text_hash, LT_VERSION) -> raw LT JSON ({"matches": [...]}); shared, treat as read-only
+_lt_cache = LRUCache(LT_CACHE_SIZE)
+_lt_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+_lt_stats_lock = threading.Lock()
+_lt_pruned_at = 0.0
+
+
+def _normalize_lt_text(s: str) -> str:
+    """
+    Key (and payload) normalization for LanguageTool. Only changes that cannot
+    alter LT findings: Unicode NFC and trimming. Case and inner whitespace are
+    kept because LT reports on them and match offsets refer to this exact text.
+    """
+    return unicodedata.normalize("NFC", s or "").strip()
+
+
+def _lt_count(key: str) -> None:
+    with _lt_stats_lock:
+        _lt_stats[key] += 1
+
+
+def languagetool_cache_stats() -> Dict[str, Any]:
+    with _lt_stats_lock:
+        stats = dict(_lt_stats)
+    total = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    stats["hit_rate"] = ((stats["memory_hits"] + stats["db_hits"]) / total) if total else 0.0
+    stats["memory"] = _lt_cache.stats()
+    return stats
+
+
+def _lt_cache_get_db(text_hash: str) -> Optional[Dict[str, Any]]:
+    conn = get_db_connection()
+    row = conn.execute(
+        """
+        SELECT matches_json
+        FROM languagetool_results
+        WHERE text_hash = ? AND lt_version = ?
+        """,
+        (text_hash, LT_VERSION),
+    ).fetchone()
+    if row is None:
+        return None
+    return {"matches": json.loads(row["matches_json"])}
+
+
+def _lt_cache_put_db(text_hash: str, lt_json: Dict[str, Any]) -> None:
+    global _lt_pruned_at
+
+    conn = get_db_connection()
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO languagetool_results (text_hash, lt_version, matches_json)
+        VALUES (?, ?, ?)
+        """,
+        (text_hash, LT_VERSION, json.dumps(lt_json.get("matches", []) or [], ensure_ascii=False)),
+    )
+    conn.commit()
+
+    now = time.monotonic()
+    if now - _lt_pruned_at > LT_PRUNE_INTERVAL_S:
+        _lt_pruned_at = now
+        prune_languagetool_results()
+
+
+def prune_languagetool_results(max_age_days: int = LT_CACHE_MAX_AGE_DAYS) -> int:
+    """
+    Evicts cached LanguageTool results older than max_age_days, and any stored
+    under a different LT_VERSION. Returns the number of rows deleted.
+    """
+    conn = get_db_connection()
+    cur = conn.execute(
+        """
+        DELETE FROM languagetool_results
+        WHERE created_at < datetime('now', ?)
+           OR lt_version != ?
+        """,
+        (f"-{int(max_age_days)} days", LT_VERSION),
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+async def _languagetool_check_cached(text: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    _languagetool_check with a memory + SQLite cache in front. text should
+    already be normalized with _normalize_lt_text.
+    """
+    text_hash = _sha256_hex(text)
+    key = (text_hash, LT_VERSION)
+
+    lt_json = _lt_cache.get(key)
+    if lt_json is not None:
+        _lt_count("memory_hits")
+        return lt_json
+
+    lt_json = await asyncio.to_thread(_lt_cache_get_db, text_hash)
+    if lt_json is not None:
+        _lt_count("db_hits")
+        _lt_cache.put(key, lt_json)
+        return lt_json
+
+    _lt_count("misses")
+    lt_json = {"matches": (await _languagetool_check(text, deadline)).get("matches", []) or []}
+    _lt_cache.put(key, lt_json)
+    await asyncio.to_thread(_lt_cache_put_db, text_hash, lt_json)
+    return lt_json
 
 
 def _lt_is_objective_error(match: Dict[str, Any]) -> bool:
@@ -452,66 +1129,92 @@ def _format_lt_summary(lt_json: Optional[Dict[str, Any]], original: str, max_ite
 
 
 # -------------------------
-# Core evaluation
+# Async runtime
 # -------------------------
+# All evaluations run on one long-lived event loop in a background thread, so the
+# pooled HTTP clients are shared and many evaluations can be in flight at once
+# regardless of which thread (or request loop) asked for them.
 
-def evaluate_translation(
-    level: str,
-    english: str,
-    user_norwegian: str,
-    sentence_id: Optional[int] = None
-) -> Tuple[Evaluation, Optional[int]]:
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_openai_client: Optional[AsyncOpenAI] = None
+_openai_slots = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+# Single-flight: feedback signature -> future for the evaluation in progress.
+# Only touched from the evaluation loop, so no lock is needed.
+_inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+_singleflight_stats = {"leaders": 0, "coalesced": 0}
+
+# Running totals of grading calls made by this process (for cost reporting)
+_llm_usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+_llm_usage_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is not None:
+        return _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="evaluation-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def _get_openai_client() -> AsyncOpenAI:
+    # Only called from the evaluation loop
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI()
+    return _openai_client
+
+
+def _record_llm_usage(response: Any) -> None:
+    usage = getattr(response, "usage", None)
+    with _llm_usage_lock:
+        _llm_usage["calls"] += 1
+        if usage is not None:
+            _llm_usage["input_tokens"] += int(getattr(usage, "input_tokens", 0) or 0)
+            _llm_usage["output_tokens"] += int(getattr(usage, "output_tokens", 0) or 0)
+
+
+def llm_usage_stats() -> Dict[str, int]:
+    with _llm_usage_lock:
+        return dict(_llm_usage)
+
+
+def singleflight_stats() -> Dict[str, int]:
     """
-    Returns (Evaluation, feedback_id). feedback_id is None if sentence_id is None.
+    leaders: evaluations that ran past the gold check; coalesced: requests
+    that waited on an identical in-flight evaluation instead.
     """
-    # 0) Stored translations first
-    if sentence_id is not None:
-        matched = check_against_gold(sentence_id, user_norwegian)
-        if matched is not None:
-            ev = Evaluation(
-                verdict="correct",
-                meaning="same",
-                corrected=matched,
-                issues=[],
-                short_rule="Godkjent: Svaret matcher en lagret fasit (bokmål).",
-            )
-            feedback_id = _cache_put(level, sentence_id, user_norwegian, ev)
-            return ev, feedback_id
-
-    # 0b) Cache check
-    if sentence_id is not None:
-        cached = _cache_get(level, sentence_id, user_norwegian)
-        if cached is not None:
-            ev, feedback_id = cached
-            return ev, feedback_id
+    return {**_singleflight_stats, "in_flight": len(_inflight)}
 
-    # 1) LanguageTool (objective arbiter)
-    lt_json: Optional[Dict[str, Any]] = None
-    lt_issues: List[Issue] = []
-    lt_objective: List[Dict[str, Any]] = []
 
+async def _on_evaluation_loop(coro):
+    """
+    Await a coroutine on the evaluation loop from any event loop.
+    """
+    loop = _get_loop()
     try:
-        lt_json = _languagetool_check(user_norwegian)
-        lt_issues, lt_objective = _lt_to_issues(lt_json, user_norwegian)
-    except Exception:
-        lt_json = None
-        lt_issues = []
-        lt_objective = []
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
 
-    lt_summary = _format_lt_summary(lt_json, user_norwegian)
 
-    # 2) Single LLM pass: grading
-    response = client.responses.parse(
-        model=MODEL_ID,
-        input=[
-            {"role": "system", "content": _grading_system_prompt()},
-            {"role": "user", "content": _grading_user_prompt(level, english, user_norwegian, lt_summary)},
-        ],
-        text_format=Evaluation,
-    )
-
-    ev: Evaluation = response.output_parsed
+# -------------------------
+# Core evaluation
+# -------------------------
 
+def _merge_lt_and_llm(
+    ev: Evaluation,
+    lt_issues: List[Issue],
+    lt_objective: List[Dict[str, Any]],
+) -> Evaluation:
     # 3) Merge LT issues (objective errors win)
     merged: List[Issue] = []
     if lt_issues:
@@ -544,8 +1247,271 @@ def evaluate_translation(
     if len(lt_objective) == 0 and ev.meaning == "same" and error_count == 0:
         ev.verdict = "correct"
 
+    return ev
+
+
+EvaluationEvent = Tuple[str, Dict[str, Any]]
+
+_PARTIAL_FIELDS = ("verdict", "meaning", "corrected", "issues", "short_rule")
+
+
+def _partial_fields(snapshot: str) -> Dict[str, Any]:
+    """
+    Best-effort parse of the LLM's JSON output while it is still streaming.
+    Incomplete trailing strings are returned as far as they have arrived.
+    """
+    try:
+        data = jiter.from_json(snapshot.encode("utf-8"), partial_mode="trailing-strings")
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {k: data[k] for k in _PARTIAL_FIELDS if k in data}
+
+
+async def _evaluation_events(
+    level: str,
+    english: str,
+    user_norwegian: str,
+    sentence_id: Optional[int],
+    deadline: Optional[float] = None,
+    stream: bool = False,
+) -> AsyncIterator[EvaluationEvent]:
+    """
+    The evaluation pipeline as a sequence of events:
+      ("lt", {...})       LanguageTool stage done: its issues and verdict floor
+      ("partial", {...})  fields of the LLM output so far (only when stream=True)
+      ("final", {...})    evaluation, feedback_id and source
+                          (gold, gold_punctuation, cache or llm)
+    Fast paths emit only "final". Concurrent identical answers share one
+    evaluation; followers only see "final" (with coalesced=True), or the
+    leader's exception if it fails.
+    """
+    if deadline is None:
+        deadline = time.monotonic() + SUBMIT_BUDGET_S
+
+    # 0) Stored translations first (off the loop: a cold or stale index is rebuilt from SQLite)
+    if sentence_id is not None:
+        matched = await asyncio.to_thread(check_against_gold, sentence_id, user_norwegian)
+        if matched is not None:
+            canonical, feedback_id = matched
+            yield "final", {"evaluation": _gold_evaluation(canonical), "feedback_id": feedback_id, "source": "gold"}
+            return
+
+    if sentence_id is None:
+        async for event in _uncached_events(level, english, user_norwegian, sentence_id, deadline, stream):
+            yield event
+        return
+
+    # Single-flight: wait for an identical in-flight evaluation instead of paying for our own
+    sig = feedback_signature(level, sentence_id, user_norwegian)
+    while sig in _inflight:
+        leader = _inflight[sig]
+        try:
+            result = await asyncio.shield(leader)
+        except asyncio.CancelledError:
+            if not leader.cancelled():
+                raise
+            continue  # leader's client went away; next in line (possibly us) evaluates
+        _singleflight_stats["coalesced"] += 1
+        yield "final", {**result, "source": "coalesced", "coalesced": True}
+        return
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[sig] = future
+    _singleflight_stats["leaders"] += 1
+    try:
+        async for name, data in _uncached_events(level, english, user_norwegian, sentence_id, deadline, stream):
+            if name == "final":
+                future.set_result(data)
+            yield name, data
+    except Exception as exc:
+        # Followers get the same error rather than each retrying in turn
+        if not future.done():
+            future.set_exception(exc)
+            future.exception()  # retrieved: no warning when nobody was waiting
+        raise
+    finally:
+        if _inflight.get(sig) is future:
+            del _inflight[sig]
+        if not future.done():
+            future.cancel()
+
+
+async def _uncached_events(
+    level: str,
+    english: str,
+    user_norwegian: str,
+    sentence_id: Optional[int],
+    deadline: float,
+    stream: bool,
+) -> AsyncIterator[EvaluationEvent]:
+    """
+    Everything after the gold check: cache, gold-punctuation, LanguageTool, LLM.
+    """
+    # 0b) Cache check
+    if sentence_id is not None:
+        cached = await asyncio.to_thread(_cache_get, level, sentence_id, user_norwegian)
+        if cached is not None:
+            ev, feedback_id = cached
+            yield "final", {"evaluation": ev, "feedback_id": feedback_id, "source": "cache"}
+            return
+
+    # 0c) Same words as a stored translation, punctuation aside: resolve locally
+    if sentence_id is not None:
+        kind, canonical = await asyncio.to_thread(classify_against_gold, sentence_id, user_norwegian)
+        if kind == "gold_punctuation":
+            ev = _gold_punctuation_evaluation(canonical)
+            feedback_id = await asyncio.to_thread(_cache_put, level, sentence_id, user_norwegian, ev)
+            yield "final", {"evaluation": ev, "feedback_id": feedback_id, "source": "gold_punctuation"}
+            return
+
+    # 1) LanguageTool (objective arbiter)
+    lt_json: Optional[Dict[str, Any]] = None
+    lt_issues: List[Issue] = []
+    lt_objective: List[Dict[str, Any]] = []
+
+    # LT offsets refer to lt_text, so use it for span lookups below
+    lt_text = _normalize_lt_text(user_norwegian)
+
+    try:
+        lt_json = await _languagetool_check_cached(lt_text, deadline - LLM_RESERVE_S)
+        lt_issues, lt_objective = _lt_to_issues(lt_json, lt_text)
+    except Exception:
+        lt_json = None
+        lt_issues = []
+        lt_objective = []
+
+    yield "lt", {
+        "available": lt_json is not None,
+        "verdict_floor": _lt_verdict_floor(lt_objective),
+        "issues": [i.model_dump() for i in lt_issues],
+    }
+
+    lt_summary = _format_lt_summary(lt_json, lt_text)
+
+    # 2) Single LLM pass: grading
+    llm_input = [
+        {"role": "system", "content": _grading_system_prompt()},
+        {"role": "user", "content": _grading_user_prompt(level, english, user_norwegian, lt_summary)},
+    ]
+    timeout = max(1.0, deadline - time.monotonic())
+
+    async with _openai_slots:
+        if stream:
+            async with _get_openai_client().responses.stream(
+                model=MODEL_ID,
+                input=llm_input,
+                text_format=Evaluation,
+                timeout=timeout,
+            ) as llm_stream:
+                last: Dict[str, Any] = {}
+                async for event in llm_stream:
+                    if event.type != "response.output_text.delta":
+                        continue
+                    fields = _partial_fields(event.snapshot)
+                    if fields and fields != last:
+                        last = fields
+                        yield "partial", fields
+                response = await llm_stream.get_final_response()
+        else:
+            response = await _get_openai_client().responses.parse(
+                model=MODEL_ID,
+                input=llm_input,
+                text_format=Evaluation,
+                timeout=timeout,
+            )
+
+    _record_llm_usage(response)
+
+    ev: Evaluation = _merge_lt_and_llm(response.output_parsed, lt_issues, lt_objective)
+
+    feedback_id = None
     if sentence_id is not None:
-        feedback_id = _cache_put(level, sentence_id, user_norwegian, ev)
-        return ev, feedback_id
+        feedback_id = await asyncio.to_thread(_cache_put, level, sentence_id, user_norwegian, ev)
+
+    yield "final", {"evaluation": ev, "feedback_id": feedback_id, "source": "llm"}
+
+
+async def _evaluate(
+    level: str,
+    english: str,
+    user_norwegian: str,
+    sentence_id: Optional[int],
+    deadline: Optional[float] = None,
+    with_source: bool = False,
+) -> Tuple[Any, ...]:
+    async for name, data in _evaluation_events(level, english, user_norwegian, sentence_id, deadline):
+        if name == "final":
+            if with_source:
+                return data["evaluation"], data["feedback_id"], data["source"]
+            return data["evaluation"], data["feedback_id"]
+    raise RuntimeError("Evaluation pipeline ended without a result")
+
+
+async def evaluate_translation_async(
+    level: str,
+    english: str,
+    user_norwegian: str,
+    sentence_id: Optional[int] = None,
+    *,
+    deadline: Optional[float] = None,
+    with_source: bool = False,
+) -> Tuple[Any, ...]:
+    """
+    Async version of evaluate_translation; safe to await from any event loop.
+    Returns (Evaluation, feedback_id). feedback_id is None if sentence_id is None.
+    deadline: time.monotonic() by which the submit should be answered
+    (defaults to SUBMIT_BUDGET_S from now).
+    with_source=True appends where the result came from (gold, gold_punctuation,
+    cache, coalesced or llm).
+    """
+    return await _on_evaluation_loop(
+        _evaluate(level, english, user_norwegian, sentence_id, deadline, with_source)
+    )
+
+
+def evaluate_translation(
+    level: str,
+    english: str,
+    user_norwegian: str,
+    sentence_id: Optional[int] = None,
+    *,
+    deadline: Optional[float] = None,
+    with_source: bool = False,
+) -> Tuple[Any, ...]:
+    """
+    Returns (Evaluation, feedback_id). feedback_id is None if sentence_id is None.
+    Blocking wrapper around evaluate_translation_async (see it for with_source).
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        _evaluate(level, english, user_norwegian, sentence_id, deadline, with_source),
+        _get_loop(),
+    )
+    return future.result()
+
 
-    return ev, None
+def iter_evaluation_events(
+    level: str,
+    english: str,
+    user_norwegian: str,
+    sentence_id: Optional[int] = None,
+    *,
+    deadline: Optional[float] = None,
+) -> Iterator[EvaluationEvent]:
+    """
+    Blocking iterator over the streamed evaluation events (see
+    _evaluation_events), for use from sync code such as a Flask streaming
+    response. The LLM output is streamed, so "partial" events are included.
+    """
+    loop = _get_loop()
+    events = _evaluation_events(level, english, user_norwegian, sentence_id, deadline, stream=True)
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(events.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        # Client went away mid-stream: close the generator (and the LLM stream) on its loop
+        asyncio.run_coroutine_threadsafe(events.aclose(), loop).result()
@@ -0,0 +1,71 @@
+"""
+Compact storage format for translation_feedback rows.
+
+payload     1 format byte + raw DEFLATE of compact JSON, primed with a preset
+            dictionary of the keys and stock phrases every evaluation repeats
+            (most payloads are a few hundred bytes, too short for plain zlib
+            to find much to reuse on its own).
+sig_key     first 8 bytes of SHA-256(signature) as a signed 64-bit integer, so
+            the cache lookup is one INTEGER UNIQUE index. At 1M rows the chance
+            of any collision is ~3e-8.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+# Bump (and keep the old dictionary for decoding) if _ZDICT_V1 ever changes
+_FORMAT_V1 = 1
+
+# zlib favours matches near the end of the dictionary, so the most common
+# strings go last.
+_ZDICT_V1 = (
+    '"category":"tegnsetting","category":"rettskriving","category":"register",'
+    '"category":"ordvalg","category":"kjønn","category":"bøying",'
+    '"category":"preposisjon","category":"V2",'
+    '"severity":"variant","severity":"style","severity":"error",'
+    '"explanation":"","fix":""}'
+    '"Godkjent: Ordene matcher en lagret fasit; sammenlign tegnsettingen med forslaget."'
+    '"Godkjent: Svaret matcher en lagret fasit (bokmål)."'
+    '{"verdict":"incorrect","meaning":"different","verdict":"minor","meaning":"minor_drift",'
+    '{"verdict":"correct","meaning":"same","corrected":"","issues":[],"short_rule":"'
+).encode("utf-8")
+
+# Key inside the packed document for the normalized answer (not part of the evaluation)
+_ANSWER_KEY = "_answer"
+
+
+def signature_key(signature: str) -> int:
+    return int.from_bytes(hashlib.sha256(signature.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+def pack_feedback(evaluation: Dict[str, Any], answer_norm: Optional[str] = None) -> bytes:
+    """
+    Encodes an evaluation dict (plus, optionally, the normalized answer it
+    grades, which warm-cache needs to re-evaluate it later).
+    """
+    doc = dict(evaluation)
+    if answer_norm is not None:
+        doc[_ANSWER_KEY] = answer_norm
+    raw = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    deflate = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, _ZDICT_V1)
+    return bytes((_FORMAT_V1,)) + deflate.compress(raw) + deflate.flush()
+
+
+def unpack_feedback(payload: bytes) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Returns (evaluation dict, normalized answer or None)."""
+    if payload[0] != _FORMAT_V1:
+        raise ValueError(f"Unknown feedback payload format {payload[0]}")
+    inflate = zlib.decompressobj(-15, _ZDICT_V1)
+    # json.loads on str is faster than on bytes (no encoding sniffing)
+    doc = json.loads((inflate.decompress(payload[1:]) + inflate.flush()).decode("utf-8"))
+    answer_norm = doc.pop(_ANSWER_KEY, None)
+    return doc, answer_norm
+
+
+def unpack_evaluation(payload: Optional[bytes]) -> Dict[str, Any]:
+    if not payload:
+        return {}
+    return unpack_feedback(payload)[0]
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+
+class LanguageToolUnavailable(Exception):
+    """Raised when LanguageTool is skipped (circuit open, no time left) or fails."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and stays open for
+    `cooldown_s`. After the cool-down one trial call is let through (half-open);
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_s: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.cooldown_s:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        return self.acquire()[0]
+
+    def acquire(self) -> Tuple[bool, bool]:
+        """
+        (allowed, trial): whether a call may go ahead and, in the same step,
+        whether it took the half-open trial slot. A trial must end with
+        record_success, record_failure or release_trial.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True, False
+            if time.monotonic() - self._opened_at < self.cooldown_s:
+                return False, False
+            if self._trial_in_flight:
+                return False, False
+            self._trial_in_flight = True
+            return True, True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Frees the half-open slot of a trial call that ended without an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class LanguageToolClient:
+    """
+    Keep-alive LanguageTool /v2/check client.
+
+    Uses one pooled httpx.AsyncClient (created lazily on the loop that first
+    uses it), caps each call by the caller's deadline, and skips LT entirely
+    while the circuit breaker is open.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        language: str,
+        *,
+        timeout_s: float = 4.0,
+        min_timeout_s: float = 0.25,
+        max_connections: int = 50,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.endpoint = endpoint
+        self.language = language
+        self.timeout_s = timeout_s
+        self.min_timeout_s = min_timeout_s
+        self.max_connections = max_connections
+        self.breaker = breaker or CircuitBreaker()
+        self._http: Optional[httpx.AsyncClient] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._http
+
+    async def check(self, text: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Returns the /v2/check JSON. deadline is a time.monotonic() timestamp;
+        the request timeout is the smaller of timeout_s and the time left.
+        """
+        timeout_s = self.timeout_s
+        if deadline is not None:
+            timeout_s = min(timeout_s, deadline - time.monotonic())
+        if timeout_s < self.min_timeout_s:
+            raise LanguageToolUnavailable("No time left in the budget for LanguageTool")
+
+        allowed, trial = self.breaker.acquire()
+        if not allowed:
+            raise LanguageToolUnavailable("LanguageTool circuit is open")
+
+        settled = False
+        try:
+            r = await self._client().post(
+                self.endpoint,
+                data={"language": self.language, "text": text},
+                timeout=timeout_s,
+            )
+            r.raise_for_status()
+            data = r.json()
+            settled = True
+        except Exception as exc:
+            settled = True
+            self.breaker.record_failure()
+            raise LanguageToolUnavailable(str(exc)) from exc
+        finally:
+            # Cancelled (client disconnect, stream closed): says nothing about
+            # LT's health, but the trial must not keep the circuit shut for good
+            if not settled and trial:
+                self.breaker.release_trial()
+
+        self.breaker.record_success()
+        return data
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -0,0 +1,108 @@
+"""
+Tiny local stand-in for LanguageTool's /v2/check, for exercising latency and
+failure handling offline.
+
+    python -m ai.lt_stub --port 8081 --latency 0.5 --fail-rate 0.2
+    LANGUAGETOOL_ENDPOINT=http://127.0.0.1:8081/v2/check flask --app app.py run
+
+Words passed with --flag are reported as misspellings; everything else is clean.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Optional, Tuple
+from urllib.parse import parse_qs
+
+
+def _make_handler(latency_s: float, fail_rate: float, fail_status: int, flagged: Iterable[str]):
+    flagged_words = {w.lower() for w in flagged}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            text = (form.get("text") or [""])[0]
+
+            if latency_s > 0:
+                time.sleep(latency_s)
+
+            if random.random() < fail_rate:
+                self.send_response(fail_status)
+                self.end_headers()
+                return
+
+            matches = []
+            for m in re.finditer(r"\w+", text):
+                if m.group(0).lower() in flagged_words:
+                    matches.append({
+                        "message": "Mulig skrivefeil funnet.",
+                        "offset": m.start(),
+                        "length": len(m.group(0)),
+                        "replacements": [],
+                        "rule": {"id": "STUB_SPELLER", "issueType": "misspelling"},
+                    })
+
+            body = json.dumps({"matches": matches}).encode("utf-8")
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client gave up (timeout); that's the point of --latency
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve_stub(
+    port: int = 0,
+    *,
+    latency_s: float = 0.0,
+    fail_rate: float = 0.0,
+    fail_status: int = 503,
+    flagged: Iterable[str] = (),
+    host: str = "127.0.0.1",
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Starts the stub in a background thread. Returns (server, endpoint URL);
+    call server.shutdown() when done. port=0 picks a free port.
+    """
+    server = ThreadingHTTPServer((host, port), _make_handler(latency_s, fail_rate, fail_status, flagged))
+    threading.Thread(target=server.serve_forever, name="lt-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v2/check"
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local LanguageTool stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to sleep per request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests that fail (0-1)")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--flag", action="append", default=[], help="word to report as misspelled")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        _make_handler(args.latency, args.fail_rate, args.fail_status, args.flag),
+    )
+    print(f"LanguageTool stub on http://{args.host}:{args.port}/v2/check")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
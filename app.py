@@ -8,9 +8,11 @@ from openai import OpenAI
 from pydantic import BaseModel, Field
 from typing import Literal, List
 from ai.evaluator import evaluate_translation
-from db import get_db_connection, init_db, seed_db
-from routes import register_routes
+from db import get_db_connection, init_db, seed_db, register_db
+from routes import register_routes, SUBMIT_MODE
 from filters import register_filters
+from commands import register_commands
+from jobs import start_evaluation_workers
 
 
 app = Flask(__name__)
@@ -22,5 +24,10 @@ with app.app_context():
     init_db()
     seed_db()
 
+register_db(app)
 register_routes(app)
-register_filters(app)
\ No newline at end of file
+register_filters(app)
+register_commands(app)
+
+if SUBMIT_MODE == "queue":
+    start_evaluation_workers()
\ No newline at end of file
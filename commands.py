@@ -0,0 +1,631 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import click
+
+from db import DB_CACHE_KIB, convert_auto_vacuum, get_db_connection, incremental_vacuum
+from game_engine import LEVELS, GameEngine, simulate, simulate_learners, uniform_distribution
+from jobs import EVAL_WORKERS, start_evaluation_workers
+from ai.feedback_codec import signature_key, unpack_feedback
+from ai.evaluator import (
+    FEEDBACK_MAX_AGE_DAYS,
+    FEEDBACK_MIN_HITS,
+    MODEL_ID,
+    PROMPT_VERSION,
+    backfill_feedback_issues,
+    classify_against_gold,
+    compact_feedback,
+    evaluate_translation,
+    feedback_signature,
+    llm_usage_stats,
+    _normalize_cache_key,
+    _normalize_nb,
+)
+
+
+# translation_feedback as it was before migration 0004, for bench-feedback-storage
+_LEGACY_FEEDBACK_DDL = """
+CREATE TABLE translation_feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    level TEXT NOT NULL,
+    sentence_id INTEGER NOT NULL,
+    model_id TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    translation_norm TEXT NOT NULL,
+    translation_hash TEXT NOT NULL,
+    signature TEXT NOT NULL UNIQUE,
+    verdict TEXT NOT NULL,
+    feedback_json TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (datetime('now','localtime')),
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_feedback_lookup
+    ON translation_feedback(level, sentence_id, model_id, prompt_version, translation_hash);
+"""
+
+_COMPACT_FEEDBACK_DDL = """
+CREATE TABLE translation_feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sig_key INTEGER NOT NULL UNIQUE,
+    level TEXT NOT NULL,
+    sentence_id INTEGER NOT NULL,
+    model_id TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    translation_hash BLOB NOT NULL,
+    verdict TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (datetime('now','localtime')),
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    archived INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_feedback_version ON translation_feedback(model_id, prompt_version);
+"""
+
+_BENCH_WORDS = (
+    "jeg du han hun vi de er var har hadde skal kan vil må ikke også bare veldig "
+    "huset bilen byen jobben skolen boka vennen kvelden morgenen helgen sommeren "
+    "går kommer liker spiser leser skriver bor jobber reiser snakker forstår"
+).split()
+
+
+def _synthetic_feedback(rng, i: int):
+    """(level, sentence_id, answer_norm, evaluation dict) resembling real rows."""
+    level = ("A1", "A2", "B1", "B2", "C1", "C2")[i % 6]
+    sentence_id = rng.randrange(1, 20_000)
+    words = rng.choices(_BENCH_WORDS, k=rng.randrange(4, 14))
+    answer = " ".join(words) + f" {i}"
+    corrected = " ".join(words).capitalize() + "."
+    verdict = rng.choice(("correct", "minor", "incorrect"))
+    issues = [
+        {
+            "category": rng.choice(("V2", "preposisjon", "bøying", "kjønn", "ordvalg", "tegnsetting")),
+            "severity": rng.choice(("error", "variant", "style")),
+            "explanation": " ".join(rng.choices(_BENCH_WORDS, k=rng.randrange(8, 20))).capitalize() + ".",
+            "fix": corrected,
+        }
+        for _ in range(0 if verdict == "correct" else rng.randrange(1, 4))
+    ]
+    evaluation = {
+        "verdict": verdict,
+        "meaning": "same" if verdict != "incorrect" else "minor_drift",
+        "corrected": corrected,
+        "issues": issues,
+        "short_rule": " ".join(rng.choices(_BENCH_WORDS, k=10)).capitalize() + ".",
+    }
+    return level, sentence_id, answer, evaluation
+
+
+class _RateLimiter:
+    """Spaces out call starts to at most `rate` per second across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def register_commands(app):
+    @app.cli.command("replay-gold")
+    def replay_gold():
+        """
+        Replays translation_attempts through the gold matcher and reports how
+        many LLM calls the local gold / gold-punctuation paths would have saved.
+        """
+        conn = get_db_connection()
+        rows = conn.execute(
+            """
+            SELECT sentence_id, level, user_norwegian, verdict
+            FROM translation_attempts
+            ORDER BY id ASC
+            """
+        ).fetchall()
+
+        kinds = Counter()
+        saved_keys = set()
+        punctuation_not_correct = 0
+
+        for r in rows:
+            kind, _ = classify_against_gold(r["sentence_id"], r["user_norwegian"])
+            kinds[kind] += 1
+            if kind == "gold_punctuation":
+                # Each distinct cache key paid for one LLM call; repeats were cache hits
+                saved_keys.add((r["level"], r["sentence_id"], _normalize_cache_key(r["user_norwegian"])))
+                if r["verdict"] != "correct":
+                    punctuation_not_correct += 1
+
+        click.echo(f"attempts replayed:          {len(rows)}")
+        click.echo(f"exact gold:                 {kinds['gold']}")
+        click.echo(f"gold with punctuation diff: {kinds['gold_punctuation']}")
+        click.echo(f"unknown (LT + LLM):         {kinds['unknown']}")
+        click.echo(f"LLM calls saved:            {len(saved_keys)}")
+        click.echo(f"  of which LLM did not say 'correct': {punctuation_not_correct} attempts")
+
+    @app.cli.command("warm-cache")
+    @click.option("--top", default=20, show_default=True, help="Most frequent answers to warm per sentence.")
+    @click.option("--limit", default=0, help="Stop after this many evaluations (0 = no limit).")
+    @click.option("--workers", default=4, show_default=True, help="Concurrent evaluations.")
+    @click.option("--rps", default=2.0, show_default=True, help="Max evaluations started per second.")
+    @click.option("--price-in", default=0.05, show_default=True, help="USD per 1M input tokens.")
+    @click.option("--price-out", default=0.40, show_default=True, help="USD per 1M output tokens.")
+    @click.option("--dry-run", is_flag=True, help="Only list what would be evaluated.")
+    def warm_cache(top, limit, workers, rps, price_in, price_out, dry_run):
+        """
+        Pre-fills translation_feedback for the current MODEL_ID/PROMPT_VERSION
+        from the most frequent answers cached under other versions. Run it with
+        the new code before switching traffic over.
+
+        Resumable: answers that already have a row under the current version
+        are skipped, so an interrupted run can simply be started again.
+        """
+        conn = get_db_connection()
+        candidates = conn.execute(
+            """
+            WITH old AS (
+                SELECT
+                    tf.level,
+                    tf.sentence_id,
+                    tf.translation_hash,
+                    tf.payload,
+                    tf.hit_count
+                        + (SELECT COUNT(*) FROM translation_attempts ta WHERE ta.feedback_id = tf.id)
+                        AS popularity,
+                    (SELECT ta.user_norwegian FROM translation_attempts ta
+                      WHERE ta.feedback_id = tf.id LIMIT 1) AS sample
+                FROM translation_feedback tf
+                WHERE NOT (tf.model_id = ? AND tf.prompt_version = ?)
+            ),
+            grouped AS (
+                SELECT level, sentence_id, translation_hash,
+                       SUM(popularity) AS popularity,
+                       MAX(sample) AS sample,
+                       MAX(payload) AS payload
+                FROM old
+                GROUP BY level, sentence_id, translation_hash
+            ),
+            ranked AS (
+                SELECT g.*,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY g.sentence_id ORDER BY g.popularity DESC
+                       ) AS rn
+                FROM grouped g
+            )
+            SELECT r.level, r.sentence_id, r.payload, r.sample, r.popularity,
+                   s.sentence AS english
+            FROM ranked r
+            JOIN source_sentences s ON s.id = r.sentence_id
+            WHERE r.rn <= ?
+            ORDER BY r.popularity DESC
+            """,
+            (MODEL_ID, PROMPT_VERSION, top),
+        ).fetchall()
+
+        todo = []
+        skipped = 0
+        for r in candidates:
+            # Prefer a real learner answer; the packed answer is lower-cased
+            text = r["sample"] or unpack_feedback(r["payload"])[1]
+            if not text:
+                # Archived row: the answer text was dropped
+                skipped += 1
+                continue
+            kind, _ = classify_against_gold(r["sentence_id"], text)
+            if kind != "unknown":
+                skipped += 1
+                continue
+            exists = conn.execute(
+                "SELECT 1 FROM translation_feedback WHERE sig_key = ?",
+                (signature_key(feedback_signature(r["level"], r["sentence_id"], text)),),
+            ).fetchone()
+            if exists:
+                skipped += 1
+                continue
+            todo.append((r["level"], r["english"], text, r["sentence_id"]))
+
+        if limit:
+            todo = todo[:limit]
+
+        click.echo(
+            f"{MODEL_ID} / {PROMPT_VERSION}: {len(candidates)} candidates, "
+            f"{skipped} already warm or gold, {len(todo)} to evaluate"
+        )
+        if dry_run or not todo:
+            return
+
+        limiter = _RateLimiter(rps)
+        usage_before = llm_usage_stats()
+        done = failed = 0
+
+        def run(item):
+            limiter.wait()
+            level, english, text, sentence_id = item
+            evaluate_translation(level, english, text, sentence_id=sentence_id)
+
+        def cost() -> tuple:
+            usage = llm_usage_stats()
+            tokens_in = usage["input_tokens"] - usage_before["input_tokens"]
+            tokens_out = usage["output_tokens"] - usage_before["output_tokens"]
+            usd = tokens_in / 1e6 * price_in + tokens_out / 1e6 * price_out
+            return usage["calls"] - usage_before["calls"], tokens_in, tokens_out, usd
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run, item) for item in todo]
+            for n, future in enumerate(as_completed(futures), start=1):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as exc:
+                    failed += 1
+                    click.echo(f"  failed: {exc}", err=True)
+                if n % 10 == 0 or n == len(todo):
+                    calls, _, _, usd = cost()
+                    click.echo(f"[{n}/{len(todo)}] ok={done} failed={failed} llm_calls={calls} ~${usd:.4f}")
+
+        calls, tokens_in, tokens_out, usd = cost()
+        click.echo(
+            f"Done: {done} warmed, {failed} failed, {calls} LLM calls, "
+            f"{tokens_in} input + {tokens_out} output tokens, ~${usd:.4f}"
+        )
+
+    @app.cli.command("compact-feedback")
+    @click.option("--max-age-days", default=FEEDBACK_MAX_AGE_DAYS, show_default=True,
+                  help="Evict unreferenced current-version rows older than this...")
+    @click.option("--min-hits", default=FEEDBACK_MIN_HITS, show_default=True,
+                  help="...with fewer cache hits than this.")
+    @click.option("--vacuum-pages", default=0, show_default=True,
+                  help="Free pages to release afterwards (0 = all).")
+    @click.option("--dry-run", is_flag=True, help="Only count what would be evicted/archived.")
+    def compact_feedback_command(max_age_days, min_hits, vacuum_pages, dry_run):
+        """
+        Applies the translation_feedback retention policy: evicts stale cache
+        rows no attempt references, archives referenced rows from old
+        MODEL_ID/PROMPT_VERSIONs in slim form, then runs an incremental vacuum.
+        Safe to run from cron while the app is up.
+        """
+        result = compact_feedback(max_age_days, min_hits, dry_run=dry_run)
+        if dry_run:
+            click.echo(f"Would evict {result['evicted']} feedback rows and archive {result['archived']}")
+            return
+        click.echo(f"Evicted {result['evicted']} feedback rows, archived {result['archived']}")
+
+        pages = incremental_vacuum(vacuum_pages)
+        if pages is None:
+            click.echo("Database is not in incremental auto-vacuum mode; run `flask convert-auto-vacuum` offline")
+            return
+        page_size = get_db_connection().execute("PRAGMA page_size").fetchone()[0]
+        click.echo(f"Released {pages} pages ({pages * page_size / 1024 / 1024:.1f} MiB)")
+
+    @app.cli.command("convert-auto-vacuum")
+    def convert_auto_vacuum_command():
+        """
+        Switches a database created before auto_vacuum=INCREMENTAL over, so
+        compact-feedback can release free pages. Rewrites the whole file under
+        an exclusive lock: stop the app first.
+        """
+        mode = get_db_connection().execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode == 2:
+            click.echo("Already in incremental auto-vacuum mode")
+            return
+        pages = convert_auto_vacuum()
+        page_size = get_db_connection().execute("PRAGMA page_size").fetchone()[0]
+        click.echo(f"Converted; released {pages} pages ({pages * page_size / 1024 / 1024:.1f} MiB)")
+
+    @app.cli.command("backfill-feedback-issues")
+    @click.option("--batch-size", default=1000, show_default=True, help="Feedback rows per transaction.")
+    def backfill_feedback_issues_command(batch_size):
+        """
+        Fills feedback_issues for translation_feedback rows written before
+        migration 0006. Resumable and safe to run while the app is up.
+        """
+        result = backfill_feedback_issues(batch_size)
+        click.echo(
+            f"Indexed {result['issues']} issues from {result['feedback_rows']} feedback rows "
+            f"({result['remaining']} ids left)"
+        )
+
+    @app.cli.command("simulate-games")
+    @click.option("--games", default=1_000_000, show_default=True, help="Synthetic games to play.")
+    @click.option("--p-correct", default=0.6, show_default=True, help="Chance an answer is correct.")
+    @click.option("--p-minor", default=0.2, show_default=True, help="Chance an answer is minor (rest: incorrect).")
+    @click.option("--level", "level_dists", multiple=True, metavar="LEVEL=P_CORRECT,P_MINOR",
+                  help="Override the distribution for one level, e.g. --level C1=0.3,0.3. Repeatable.")
+    @click.option("--promote-after", default=2, show_default=True, help="Correct answers in a row to level up.")
+    @click.option("--end-after-incorrect", default=2, show_default=True, help="Incorrect answers in a row that end a game.")
+    @click.option("--max-turns-at-level", default=5, show_default=True, help="Turns at a level before 'no_progress'.")
+    @click.option("--max-answers", default=500, show_default=True, help="Cut off games that run longer than this.")
+    @click.option("--seed", default=None, type=int, help="Random seed for a reproducible run.")
+    def simulate_games(games, p_correct, p_minor, level_dists, promote_after, end_after_incorrect,
+                       max_turns_at_level, max_answers, seed):
+        """
+        Plays synthetic games through GameEngine (no DB, no Flask) to see how
+        the progression thresholds behave under a given answer quality, and to
+        benchmark the state machine.
+        """
+        distribution = uniform_distribution(p_correct, p_minor)
+        for spec in level_dists:
+            try:
+                level, probs = spec.split("=", 1)
+                correct, minor = (float(p) for p in probs.split(","))
+                distribution[LEVELS.index(level.strip())] = (correct, correct + minor)
+            except ValueError:
+                raise click.BadParameter(f"expected LEVEL=P_CORRECT,P_MINOR, got {spec!r}", param_hint="--level")
+
+        engine = GameEngine(
+            promote_after=promote_after,
+            end_after_incorrect=end_after_incorrect,
+            max_turns_at_level=max_turns_at_level,
+        )
+        start = time.perf_counter()
+        result = simulate(engine, games, distribution, max_answers=max_answers, seed=seed)
+        elapsed = time.perf_counter() - start
+
+        click.echo(
+            f"{games} games, {result['answers']} answers in {elapsed:.2f}s "
+            f"({games / elapsed * 60 / 1e6:.2f}M games/min, {result['answers'] / elapsed / 1e6:.2f}M answers/s)"
+        )
+        click.echo(f"Answers per game: {result['answers'] / max(games, 1):.2f}")
+        for reason, count in sorted(result["end_reasons"].items(), key=lambda kv: -kv[1]):
+            click.echo(f"  ended {reason:<14} {count:>10}  {count / games:6.1%}")
+        click.echo("Final level:")
+        for level, count in zip(engine.levels, result["final_levels"]):
+            click.echo(f"  {level}  {count:>10}  {count / games:6.1%}")
+
+    @app.cli.command("simulate-placement")
+    @click.option("--games", default=20_000, show_default=True, help="Simulated learners per strategy.")
+    @click.option("--items-per-level", default=200, show_default=True, help="Sentences per level in the item bank.")
+    @click.option("--placed-z", default=GameEngine().placed_z, show_default=True,
+                  help="Adaptive: standard errors below the next level needed to end as 'placed'.")
+    @click.option("--jump-z", default=GameEngine().jump_z, show_default=True,
+                  help="Adaptive: standard errors of optimism when jumping levels on promotion.")
+    @click.option("--seed", default=1, show_default=True, help="Random seed (same learners for every strategy).")
+    def simulate_placement(games, items_per_level, placed_z, jump_z, seed):
+        """
+        Offline evaluation of adaptive difficulty and placement mode: the same
+        simulated learners play with uniform or informative sentence choice
+        (INFORMATIVE_SENTENCES) under the fixed or the adaptive rules
+        (ADAPTIVE_DIFFICULTY), and starting with a placement search. Answers per game is the number of
+        evaluations; "exact" is how often the final level matches the
+        learner's true level.
+        """
+        adaptive = GameEngine(adaptive=True, placed_z=placed_z, jump_z=jump_z)
+        strategies = [
+            ("uniform / fixed rules", GameEngine(), False, False),
+            ("informative / fixed rules", GameEngine(), True, False),
+            ("uniform / adaptive", adaptive, False, False),
+            ("informative / adaptive", adaptive, True, False),
+            ("placement / fixed rules", GameEngine(), False, True),
+            ("placement / adaptive", adaptive, True, True),
+        ]
+        results = []
+        click.echo(f"{'strategy':<28} {'answers/game':>12} {'exact':>7} {'within 1':>9} {'mean |error|':>13}")
+        for name, engine, informative, placement in strategies:
+            r = simulate_learners(
+                engine, games, informative=informative, items_per_level=items_per_level,
+                placement=placement, seed=seed,
+            )
+            results.append((name, r))
+            click.echo(
+                f"{name:<28} {r['answers'] / games:>12.2f} {r['exact']:>7.1%} "
+                f"{r['within_one']:>9.1%} {r['abs_error']:>13.3f}"
+            )
+
+        click.echo("\nAnswers per game / exact, by the learner's true level:")
+        click.echo(f"{'strategy':<28} " + " ".join(f"{level:>11}" for level in LEVELS))
+        for name, r in results:
+            cells = (
+                f"{row['answers'] / row['games']:5.1f}/{row['exact'] / row['games']:4.0%}" if row["games"] else "-"
+                for row in r["by_level"]
+            )
+            click.echo(f"{name:<28} " + " ".join(f"{cell:>11}" for cell in cells))
+
+    @app.cli.command("check-normalize-vectors")
+    def check_normalize_vectors():
+        """
+        Checks _normalize_nb and the salted gold hash against
+        static/normalize_vectors.json, and static/normalize.js too when node is
+        installed. Run after touching either normalization.
+        """
+        static = os.path.join(app.root_path, "static")
+        vectors_path = os.path.join(static, "normalize_vectors.json")
+        with open(vectors_path, encoding="utf-8") as f:
+            vectors = json.load(f)
+
+        failures = 0
+        for v in vectors["normalize"]:
+            got = _normalize_nb(v["input"])
+            if got != v["expected"]:
+                failures += 1
+                click.echo(f"python normalize {v['input']!r}: {got!r} != {v['expected']!r}")
+        for v in vectors["hash"]:
+            got = hashlib.sha256((v["salt"] + _normalize_nb(v["answer"])).encode("utf-8")).hexdigest()[: v["length"]]
+            if got != v["expected"]:
+                failures += 1
+                click.echo(f"python hash {v['answer']!r}: {got} != {v['expected']}")
+
+        node = shutil.which("node")
+        if node is None:
+            click.echo("node not found; skipped static/normalize.js")
+        else:
+            script = """
+                const { normalizeNb, goldHash } = require(process.argv[1]);
+                const vectors = require(process.argv[2]);
+                (async () => {
+                  let failures = 0;
+                  for (const v of vectors.normalize) {
+                    const got = normalizeNb(v.input);
+                    if (got !== v.expected) { failures++; console.log("js normalize", JSON.stringify(v.input), JSON.stringify(got)); }
+                  }
+                  for (const v of vectors.hash) {
+                    const got = await goldHash(v.salt, v.answer, v.length);
+                    if (got !== v.expected) { failures++; console.log("js hash", JSON.stringify(v.answer), got); }
+                  }
+                  process.exit(failures ? 1 : 0);
+                })();
+            """
+            result = subprocess.run(
+                [node, "-e", script, os.path.join(static, "normalize.js"), vectors_path],
+                capture_output=True, text=True,
+            )
+            if result.stdout:
+                click.echo(result.stdout.rstrip())
+            if result.returncode != 0:
+                failures += 1
+                if result.stderr:
+                    click.echo(result.stderr.rstrip())
+
+        total = len(vectors["normalize"]) + len(vectors["hash"])
+        if failures:
+            raise click.ClickException(f"{failures} normalization mismatches ({total} vectors)")
+        click.echo(f"All {total} normalization vectors match")
+
+    @app.cli.command("bench-feedback-storage")
+    @click.option("--rows", default=1_000_000, show_default=True, help="Synthetic feedback rows per table.")
+    @click.option("--lookups", default=20_000, show_default=True, help="Random cache lookups to time.")
+    @click.option("--dir", "directory", default=None, help="Where to build the two databases (default: a temp dir).")
+    def bench_feedback_storage(rows, lookups, directory):
+        """
+        Builds the same synthetic translation_feedback rows in the legacy layout
+        (JSON text, hex hashes, text signature, 5-column lookup index) and the
+        compact one (packed payload, BLOB hash, INTEGER sig_key), then compares
+        file size and the latency of a cache lookup + decode.
+        """
+        import random
+        import sqlite3
+        import statistics
+        import tempfile
+
+        from ai.feedback_codec import pack_feedback
+
+        directory = directory or tempfile.mkdtemp(prefix="feedback-bench-")
+        os.makedirs(directory, exist_ok=True)
+        paths = {
+            "legacy": os.path.join(directory, "legacy.db"),
+            "compact": os.path.join(directory, "compact.db"),
+        }
+        conns = {}
+        for name, path in paths.items():
+            if os.path.exists(path):
+                os.remove(path)
+            conns[name] = sqlite3.connect(path)
+            conns[name].execute("PRAGMA journal_mode = OFF")
+            conns[name].execute("PRAGMA synchronous = OFF")
+        conns["legacy"].executescript(_LEGACY_FEEDBACK_DDL)
+        conns["compact"].executescript(_COMPACT_FEEDBACK_DDL)
+
+        rng = random.Random(42)
+        signatures = []
+        started = time.monotonic()
+        batch = 10_000
+        for start in range(0, rows, batch):
+            legacy_rows, compact_rows = [], []
+            for i in range(start, min(start + batch, rows)):
+                level, sentence_id, answer, evaluation = _synthetic_feedback(rng, i)
+                thash = hashlib.sha256(answer.encode("utf-8")).hexdigest()
+                sig = f"{level}-{sentence_id}-{MODEL_ID}-{PROMPT_VERSION}-{thash[:12]}-nb-{i}"
+                signatures.append(sig)
+                legacy_rows.append((
+                    level, sentence_id, MODEL_ID, PROMPT_VERSION, answer, thash, sig,
+                    evaluation["verdict"], json.dumps(evaluation, ensure_ascii=False),
+                ))
+                compact_rows.append((
+                    signature_key(sig), level, sentence_id, MODEL_ID, PROMPT_VERSION, bytes.fromhex(thash),
+                    evaluation["verdict"], pack_feedback(evaluation, answer),
+                ))
+            conns["legacy"].executemany(
+                """
+                INSERT INTO translation_feedback (level, sentence_id, model_id, prompt_version,
+                    translation_norm, translation_hash, signature, verdict, feedback_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                legacy_rows,
+            )
+            conns["compact"].executemany(
+                """
+                INSERT INTO translation_feedback (sig_key, level, sentence_id, model_id, prompt_version,
+                    translation_hash, verdict, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                compact_rows,
+            )
+            for conn in conns.values():
+                conn.commit()
+        click.echo(f"Built {rows} rows per layout in {time.monotonic() - started:.0f}s under {directory}")
+
+        for conn in conns.values():
+            conn.execute("VACUUM")
+            conn.close()
+
+        sample = rng.sample(signatures, min(lookups, len(signatures)))
+        queries = {
+            "legacy": (
+                "SELECT id, feedback_json FROM translation_feedback WHERE signature = ?",
+                lambda sig: (sig,),
+                lambda row: json.loads(row[1]),
+            ),
+            "compact": (
+                "SELECT id, payload FROM translation_feedback WHERE sig_key = ?",
+                lambda sig: (signature_key(sig),),
+                lambda row: unpack_feedback(row[1])[0],
+            ),
+        }
+
+        results = {}
+        for name, (sql, params, decode) in queries.items():
+            # Fresh connection with the app's page cache size, so both start cold
+            conn = sqlite3.connect(paths[name])
+            conn.execute(f"PRAGMA cache_size = -{DB_CACHE_KIB}")
+            timings = []
+            for sig in sample:
+                t0 = time.perf_counter()
+                decode(conn.execute(sql, params(sig)).fetchone())
+                timings.append((time.perf_counter() - t0) * 1e6)
+            conn.close()
+            timings.sort()
+            results[name] = {
+                "size_mib": os.path.getsize(paths[name]) / 1024 / 1024,
+                "p50_us": statistics.median(timings),
+                "p99_us": timings[int(len(timings) * 0.99) - 1],
+                "mean_us": statistics.fmean(timings),
+            }
+
+        click.echo(f"{'layout':<8} {'size MiB':>10} {'p50 µs':>9} {'p99 µs':>9} {'mean µs':>9}")
+        for name, r in results.items():
+            click.echo(
+                f"{name:<8} {r['size_mib']:>10.1f} {r['p50_us']:>9.1f} {r['p99_us']:>9.1f} {r['mean_us']:>9.1f}"
+            )
+        ratio = results["compact"]["size_mib"] / results["legacy"]["size_mib"]
+        click.echo(f"compact/legacy size: {ratio:.2f}")
+
+    @app.cli.command("eval-worker")
+    @click.option("--workers", default=EVAL_WORKERS, show_default=True, help="Worker threads.")
+    def eval_worker(workers):
+        """
+        Runs evaluation workers in the foreground, processing evaluation_jobs
+        queued by web processes (use with SUBMIT_MODE=queue and EVAL_WORKERS=0
+        on the web side).
+        """
+        started = start_evaluation_workers(workers)
+        click.echo(f"{started} evaluation workers running; Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            pass
@@ -1,5 +1,12 @@
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
 import sqlite3
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from source_sentences import (
     A1_SEED,
     A2_SEED,
@@ -9,7 +16,13 @@ from source_sentences import (
     C2_SEED
 );
 
-DB_PATH = "data/app.db"
+DB_PATH = os.getenv("APP_DB_PATH", "data/app.db")
+# Seconds a writer waits on a locked database before raising "database is locked"
+DB_BUSY_TIMEOUT_S = float(os.getenv("DB_BUSY_TIMEOUT_S", "5"))
+# Page cache per connection, in KiB
+DB_CACHE_KIB = int(os.getenv("DB_CACHE_KIB", "8192"))
+# Threads (each with its own connection) that run the DB work of async views
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", "8"))
 SEED_BY_LEVEL = {
     "A1": A1_SEED,
     "A2": A2_SEED,
@@ -19,61 +32,266 @@ SEED_BY_LEVEL = {
     "C2": C2_SEED,
 }
 
-def get_db_connection():
-    connection = sqlite3.connect(DB_PATH)
-    connection.row_factory = sqlite3.Row 
+# Callbacks run after the sentence/translation corpus is (re)seeded in this process.
+_corpus_listeners = []
+
+# One long-lived connection per thread (request threads, eval loop, job workers)
+_local = threading.local()
+
+def _connect():
+    connection = sqlite3.connect(
+        DB_PATH,
+        timeout=DB_BUSY_TIMEOUT_S,
+        cached_statements=256,
+    )
+    connection.row_factory = sqlite3.Row
+    # Only takes effect on a new (empty) database; existing ones are converted
+    # offline by convert_auto_vacuum()
+    connection.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+    # WAL lets readers run alongside the single writer; NORMAL fsyncs only at checkpoints
+    connection.execute("PRAGMA journal_mode = WAL;")
+    connection.execute("PRAGMA synchronous = NORMAL;")
+    connection.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_S * 1000)};")
+    connection.execute(f"PRAGMA cache_size = -{DB_CACHE_KIB};")
+    connection.execute("PRAGMA temp_store = MEMORY;")
     connection.execute("PRAGMA foreign_keys = ON;")
     return connection
 
+def get_db_connection():
+    """
+    Returns this thread's connection, opening it on first use. Callers commit
+    their own writes but must not close it.
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = _connect()
+        _local.connection = connection
+    return connection
+
+def close_db_connection():
+    connection = getattr(_local, "connection", None)
+    if connection is not None:
+        _local.connection = None
+        connection.close()
+
+# asgiref runs each async view on a fresh thread, which would open (and never
+# reuse or clean up) a connection per call; async code hands its DB work here
+_db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_THREADS, thread_name_prefix="db")
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Awaits fn(*args, **kwargs) on the shared DB threads. Context variables
+    (Flask's request context and session) are carried over.
+    """
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_db_executor, call)
+
+def register_db(app):
+    @app.teardown_appcontext
+    def _rollback_open_transaction(exc):
+        # A request that raised mid-write must not leave its transaction
+        # (and the write lock) open on the reused connection.
+        connection = getattr(_local, "connection", None)
+        if connection is not None and connection.in_transaction:
+            connection.rollback()
+
+# Ordered schema migrations; the database's PRAGMA user_version is the number
+# applied so far. schema.sql is the v1 baseline (idempotent, so pre-versioning
+# databases adopt it in place). Never edit an applied file - append a new one.
+MIGRATIONS = [
+    "schema.sql",
+    "migrations/0002_epoch_timestamps.sql",
+    "migrations/0003_feedback_archive.sql",
+    "migrations/0004_compact_feedback.sql",
+    "migrations/0005_sentence_stats.sql",
+    "migrations/0006_feedback_issues.sql",
+    "migrations/0007_game_version.sql",
+    "migrations/0008_adaptive_difficulty.sql",
+    "migrations/0009_game_modes.sql",
+    "migrations/0010_job_game_version.sql",
+]
+
+def _sql_statements(script):
+    """Splits a SQL script into statements (trigger bodies stay whole)."""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip():
+                yield statement
+            statement = ""
+    if statement.strip() and not statement.strip().startswith("--"):
+        yield statement
+
+def _register_migration_functions(connection):
+    """SQL functions data migrations may call (see migrations/0004_*)."""
+    from ai.feedback_codec import pack_feedback, signature_key
+
+    connection.create_function("sig_key", 1, signature_key, deterministic=True)
+    connection.create_function("hash_blob", 1, bytes.fromhex, deterministic=True)
+    connection.create_function(
+        "pack_feedback", 2,
+        lambda feedback_json, answer_norm: pack_feedback(json.loads(feedback_json), answer_norm),
+        deterministic=True,
+    )
+
 def init_db():
+    """
+    Brings the schema up to len(MIGRATIONS). A no-op (one PRAGMA read) when the
+    database is current; otherwise each pending migration runs in its own
+    transaction under the write lock, so concurrently starting workers apply
+    it exactly once.
+    """
     connection = get_db_connection()
+    target = len(MIGRATIONS)
+    if connection.execute("PRAGMA user_version").fetchone()[0] >= target:
+        return
 
-    schema_path = os.path.join(
-        os.path.dirname(__file__),
-        "schema.sql"
-    )
+    _register_migration_functions(connection)
+    base_dir = os.path.dirname(__file__)
+    # Table rebuilds must not trip ON DELETE actions of referencing tables; the
+    # pragma is a no-op inside a transaction, so it is switched around them and
+    # the result is checked with foreign_key_check before each commit.
+    connection.execute("PRAGMA foreign_keys = OFF;")
+    try:
+        while True:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                version = connection.execute("PRAGMA user_version").fetchone()[0]
+                if version >= target:
+                    connection.rollback()
+                    return
+
+                with open(os.path.join(base_dir, MIGRATIONS[version]), "r", encoding="utf-8") as f:
+                    script = f.read()
+                for statement in _sql_statements(script):
+                    connection.execute(statement)
+                violation = connection.execute("PRAGMA foreign_key_check").fetchone()
+                if violation is not None:
+                    raise sqlite3.IntegrityError(
+                        f"{MIGRATIONS[version]} leaves a foreign key violation in {violation[0]}"
+                    )
+                connection.execute(f"PRAGMA user_version = {version + 1}")
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+    finally:
+        connection.execute("PRAGMA foreign_keys = ON;")
+
+def incremental_vacuum(max_pages=0):
+    """
+    Returns free pages to the OS (max_pages=0: all of them) without blocking
+    readers for long. Returns the number of pages released, or None when the
+    database predates auto_vacuum=INCREMENTAL and needs convert_auto_vacuum().
+    """
+    connection = get_db_connection()
+    if connection.in_transaction:
+        connection.commit()
 
-    with open(schema_path, "r", encoding="utf-8") as f:
-        schema_sql = f.read()
+    if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return None
 
-    connection.executescript(schema_sql)
+    freelist = connection.execute("PRAGMA freelist_count").fetchone()[0]
+    connection.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
     connection.commit()
-    connection.close()
+    return max(0, freelist - connection.execute("PRAGMA freelist_count").fetchone()[0])
 
-def seed_db():
+def convert_auto_vacuum():
+    """
+    One-time switch of an older database to auto_vacuum=INCREMENTAL. This is a
+    full VACUUM: it rewrites the whole file under an exclusive lock, so run it
+    with the app stopped. Returns the number of pages released.
+    """
     connection = get_db_connection()
-    connection.execute("PRAGMA foreign_keys = ON;")
+    if connection.in_transaction:
+        connection.commit()
 
+    before = connection.execute("PRAGMA page_count").fetchone()[0]
+    connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    connection.execute("VACUUM")
+    return max(0, before - connection.execute("PRAGMA page_count").fetchone()[0])
+
+def _seed_rows():
+    """Cleaned (level, sentence, [translations]) tuples from SEED_BY_LEVEL."""
+    rows = []
     for level, items in SEED_BY_LEVEL.items():
         for english_sentence, bokmaal_translations in items:
             english_sentence = (english_sentence or "").strip()
             if not english_sentence:
                 continue
+            translations = [t.strip() for t in bokmaal_translations if t and t.strip()]
+            rows.append((level, english_sentence, translations))
+    return rows
+
+def seed_db():
+    """
+    Loads the seed corpus. Skips entirely when its content hash matches the one
+    stored in app_meta; otherwise bulk-loads it (idempotently) in one transaction.
+    """
+    rows = _seed_rows()
+    seed_hash = hashlib.sha256(
+        json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+    connection = get_db_connection()
+    row = connection.execute("SELECT value FROM app_meta WHERE key = 'seed_hash'").fetchone()
+    if row is not None and row["value"] == seed_hash:
+        return
 
-            # 1) Insert sentence (idempotent)
-            connection.execute(
-                "INSERT OR IGNORE INTO source_sentences (level, sentence) VALUES (?, ?)",
-                (level, english_sentence),
-            )
-
-            # 2) Fetch sentence_id (works whether it was inserted now or already existed)
-            row = connection.execute(
-                "SELECT id FROM source_sentences WHERE level = ? AND sentence = ?",
-                (level, english_sentence),
-            ).fetchone()
-            sentence_id = row["id"]
-
-            # 3) Insert translations (idempotent)
-            cleaned = []
-            for t in bokmaal_translations:
-                t = (t or "").strip()
-                if t:
-                    cleaned.append((sentence_id, t))
-
-            connection.executemany(
-                "INSERT OR IGNORE INTO valid_translations (sentence_id, translation) VALUES (?, ?)",
-                cleaned,
-            )
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        row = connection.execute("SELECT value FROM app_meta WHERE key = 'seed_hash'").fetchone()
+        if row is not None and row["value"] == seed_hash:
+            connection.rollback()
+            return
 
-    connection.commit()
-    connection.close()
\ No newline at end of file
+        connection.executemany(
+            "INSERT OR IGNORE INTO source_sentences (level, sentence) VALUES (?, ?)",
+            [(level, sentence) for level, sentence, _ in rows],
+        )
+        ids = {
+            (r["level"], r["sentence"]): r["id"]
+            for r in connection.execute("SELECT id, level, sentence FROM source_sentences")
+        }
+        connection.executemany(
+            "INSERT OR IGNORE INTO valid_translations (sentence_id, translation) VALUES (?, ?)",
+            [
+                (ids[(level, sentence)], t)
+                for level, sentence, translations in rows
+                for t in translations
+            ],
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO app_meta (key, value) VALUES ('seed_hash', ?)",
+            (seed_hash,),
+        )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+    notify_corpus_change()
+
+def get_corpus_version(connection) -> int:
+    """
+    Returns the corpus version counter. It is bumped by triggers on every
+    insert/update/delete in source_sentences and valid_translations, so it also
+    catches imports done by other processes or by hand.
+    """
+    row = connection.execute(
+        "SELECT value FROM app_meta WHERE key = 'corpus_version'"
+    ).fetchone()
+    return int(row["value"]) if row else 0
+
+def on_corpus_change(callback):
+    """
+    Registers a callback to run after seed_db (or any in-process corpus import)
+    has committed. Usable as a decorator.
+    """
+    _corpus_listeners.append(callback)
+    return callback
+
+def notify_corpus_change():
+    for callback in list(_corpus_listeners):
+        callback()
\ No newline at end of file
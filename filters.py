@@ -4,6 +4,10 @@ def fmt_dt(value):
     if not value:
         return "-"
 
+    # Unix epoch seconds (games.started_ts etc.); formatted in local time
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value).strftime("%d.%m.%Y %H:%M")
+
     # handle datetime or ISO-ish strings
     if isinstance(value, datetime):
         dt = value
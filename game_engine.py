@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+# Ability/difficulty scale (logits) the estimates start from: the middle of
+# each level's band. A learner at ability t answers an item of difficulty b
+# correctly with probability 1 / (1 + exp(b - t)).
+LEVEL_DIFFICULTY = [-2.5, -1.5, -0.5, 0.5, 1.5, 2.5]
+
+CORRECT = "correct"
+MINOR = "minor"
+INCORRECT = "incorrect"
+
+
+class GameState:
+    """
+    The part of a games row the progression rules read and write. `level` is an
+    index into the engine's levels, so a step never allocates.
+    """
+
+    __slots__ = (
+        "level",
+        "correct_streak",
+        "incorrect_streak",
+        "turns_at_level",
+        "locked_sentence_id",
+        "ended",
+        "end_reason",
+        "ability",
+        "information",
+        "probe_lo",
+        "probe_hi",
+    )
+
+    def __init__(
+        self,
+        level: int = 0,
+        correct_streak: int = 0,
+        incorrect_streak: int = 0,
+        turns_at_level: int = 0,
+        locked_sentence_id: Optional[int] = None,
+        ended: bool = False,
+        end_reason: Optional[str] = None,
+        ability: float = LEVEL_DIFFICULTY[0],
+        information: float = 0.0,
+        probe_lo: Optional[int] = None,
+        probe_hi: Optional[int] = None,
+    ):
+        self.level = level
+        self.correct_streak = correct_streak
+        self.incorrect_streak = incorrect_streak
+        self.turns_at_level = turns_at_level
+        self.locked_sentence_id = locked_sentence_id
+        self.ended = ended
+        self.end_reason = end_reason
+        self.ability = ability
+        self.information = information
+        # Placement search bounds (level indices), confirming level probe_lo - 1
+        # once they cross; None once placement is over
+        self.probe_lo = probe_lo
+        self.probe_hi = probe_hi
+
+    def reset(self) -> "GameState":
+        self.level = self.correct_streak = self.incorrect_streak = self.turns_at_level = 0
+        self.locked_sentence_id = None
+        self.ended = False
+        self.end_reason = None
+        self.ability = LEVEL_DIFFICULTY[0]
+        self.information = 0.0
+        self.probe_lo = self.probe_hi = None
+        return self
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"GameState({fields})"
+
+
+# -----------------------------
+# Ability estimates
+# -----------------------------
+
+# Verdict -> observed score for the Elo-style updates below
+SCORES = {CORRECT: 1.0, MINOR: 0.5, INCORRECT: 0.0}
+
+# Prior variance of a new game's ability: the first answers move it a lot,
+# later ones less as the Fisher information sum(p * (1 - p)) grows
+ABILITY_PRIOR_VAR = 2.25
+ABILITY_K_MIN = 0.25
+# Difficulty step size shrinks with the item's attempt count (across all games)
+DIFFICULTY_K_START = 0.4
+DIFFICULTY_K_MIN = 0.02
+
+
+def expected_score(ability: float, difficulty: float) -> float:
+    return 1.0 / (1.0 + math.exp(difficulty - ability))
+
+
+def level_for_ability(ability: float, levels: int = len(LEVELS)) -> int:
+    """Index of the level whose band (prior difficulty +- 0.5) holds `ability`."""
+    return min(max(int(math.floor(ability - LEVEL_DIFFICULTY[0] + 0.5)), 0), levels - 1)
+
+
+def ability_error(state: GameState) -> float:
+    """Standard error of the game's ability estimate."""
+    return 1.0 / math.sqrt(1.0 / ABILITY_PRIOR_VAR + state.information)
+
+
+def update_difficulty(difficulty: float, attempts: int, ability: float, verdict: str) -> float:
+    """An item's difficulty after a learner of `ability` gave `verdict` on it."""
+    k = max(DIFFICULTY_K_MIN, DIFFICULTY_K_START / math.sqrt(1 + attempts))
+    return difficulty - k * (SCORES[verdict] - expected_score(ability, difficulty))
+
+
+class GameEngine:
+    """
+    Level/streak rules of a game, without Flask or SQLite:
+      - a non-correct answer locks the sentence until it is answered correctly;
+        answers to a locked sentence only unlock it and count for nothing else;
+      - `promote_after` correct answers in a row move up a level (and reset the
+        counters), staying at the top level once there;
+      - `end_after_incorrect` incorrect answers in a row end the game, as does
+        reaching `max_turns_at_level` turns on a level without a promotion streak.
+
+    When the item difficulty is passed to step(), the game's ability estimate
+    is updated too. With `adaptive`:
+      - a promotion moves straight to the level matching the estimate (plus
+        `jump_z` standard errors) when that is above the next level;
+      - after `min_turns_placed` turns at a level the game ends as "placed"
+        once the estimate is `placed_z` standard errors below the level above.
+    The defaults come from simulate_learners (flask simulate-placement).
+
+    A game started with start_placement() first binary-searches the levels
+    (one answer per probe, correct = passed, no locking, nothing ends the
+    game), then confirms the highest level passed with one more correct
+    answer, stepping down a level per miss, and continues with the rules
+    above from the level confirmed.
+    """
+
+    __slots__ = (
+        "levels",
+        "promote_after",
+        "end_after_incorrect",
+        "max_turns_at_level",
+        "adaptive",
+        "jump_z",
+        "placed_z",
+        "min_turns_placed",
+        "_top",
+    )
+
+    def __init__(
+        self,
+        levels: Sequence[str] = LEVELS,
+        promote_after: int = 2,
+        end_after_incorrect: int = 2,
+        max_turns_at_level: int = 5,
+        adaptive: bool = False,
+        jump_z: float = 0.0,
+        placed_z: float = 2.5,
+        min_turns_placed: int = 2,
+    ):
+        self.levels = tuple(levels)
+        self.promote_after = promote_after
+        self.end_after_incorrect = end_after_incorrect
+        self.max_turns_at_level = max_turns_at_level
+        self.adaptive = adaptive
+        self.jump_z = jump_z
+        self.placed_z = placed_z
+        self.min_turns_placed = min_turns_placed
+        self._top = len(self.levels) - 1
+
+    def start_placement(self, state: GameState) -> GameState:
+        """Puts a fresh game into placement: probes the middle level first."""
+        state.probe_lo, state.probe_hi = 0, self._top
+        state.level = self._top // 2
+        return state
+
+    def state_from_row(self, row: Dict) -> GameState:
+        level = self.levels.index(row["level"])
+        ability = row.get("ability")
+        return GameState(
+            level=level,
+            correct_streak=int(row["correct_streak"]),
+            incorrect_streak=int(row["incorrect_streak"]),
+            turns_at_level=int(row["turns_at_level"]),
+            locked_sentence_id=row.get("locked_sentence_id") or None,
+            ended=row.get("status") == "ended",
+            end_reason=row.get("end_reason"),
+            ability=LEVEL_DIFFICULTY[level] if ability is None else float(ability),
+            information=float(row.get("ability_info") or 0.0),
+            probe_lo=row.get("placement_lo"),
+            probe_hi=row.get("placement_hi"),
+        )
+
+    def step(
+        self,
+        state: GameState,
+        verdict: str,
+        sentence_id: Optional[int] = None,
+        difficulty: Optional[float] = None,
+    ) -> GameState:
+        """Applies one graded answer to `state` in place and returns it."""
+        if state.probe_lo is not None:
+            return self._probe(state, verdict, difficulty)
+
+        if state.locked_sentence_id is not None:
+            if verdict == CORRECT:
+                state.locked_sentence_id = None
+            return state
+
+        if verdict != CORRECT:
+            # 0 stands in for "some sentence" when the caller doesn't track ids
+            state.locked_sentence_id = sentence_id if sentence_id is not None else 0
+
+        if difficulty is not None:
+            self._update_ability(state, verdict, difficulty)
+
+        state.turns_at_level += 1
+        if verdict == CORRECT:
+            state.correct_streak += 1
+            state.incorrect_streak = 0
+        elif verdict == INCORRECT:
+            state.incorrect_streak += 1
+            state.correct_streak = 0
+        else:
+            state.correct_streak = 0
+            state.incorrect_streak = 0
+
+        if state.incorrect_streak >= self.end_after_incorrect:
+            state.ended = True
+            state.end_reason = "two_incorrect"
+        elif state.turns_at_level >= self.max_turns_at_level and state.correct_streak < self.promote_after:
+            state.ended = True
+            state.end_reason = "no_progress"
+        else:
+            state.ended = False
+            state.end_reason = None
+            if state.correct_streak >= self.promote_after:
+                target = state.level + 1
+                if self.adaptive:
+                    optimistic = state.ability + self.jump_z * ability_error(state)
+                    target = max(target, level_for_ability(optimistic, len(self.levels)))
+                state.level = min(target, self._top)
+                state.correct_streak = 0
+                state.incorrect_streak = 0
+                state.turns_at_level = 0
+            elif (
+                self.adaptive
+                and difficulty is not None
+                and state.turns_at_level >= self.min_turns_placed
+                and state.ability + self.placed_z * ability_error(state) < LEVEL_DIFFICULTY[state.level] + 0.5
+            ):
+                state.ended = True
+                state.end_reason = "placed"
+
+        return state
+
+    def _update_ability(self, state: GameState, verdict: str, difficulty: float) -> None:
+        p = expected_score(state.ability, difficulty)
+        k = max(ABILITY_K_MIN, 1.0 / (1.0 / ABILITY_PRIOR_VAR + state.information))
+        state.ability += k * (SCORES[verdict] - p)
+        state.information += p * (1.0 - p)
+
+    def _probe(self, state: GameState, verdict: str, difficulty: Optional[float]) -> GameState:
+        if difficulty is not None:
+            self._update_ability(state, verdict, difficulty)
+
+        state.correct_streak = state.incorrect_streak = state.turns_at_level = 0
+        if state.probe_lo > state.probe_hi:
+            # Confirming the level found: a second pass places the game there,
+            # a miss tries one lower
+            if verdict == CORRECT:
+                state.probe_lo = state.probe_hi = None
+                return state
+            state.probe_lo, state.probe_hi = state.level, state.level - 1
+        elif verdict == CORRECT:
+            state.probe_lo = state.level + 1
+        else:
+            state.probe_hi = state.level - 1
+
+        if state.probe_lo <= state.probe_hi:
+            state.level = (state.probe_lo + state.probe_hi) // 2
+        elif state.probe_lo > 0:
+            # Highest level passed; single answers are noisy, so it is confirmed
+            state.level = state.probe_lo - 1
+        else:
+            state.level = 0
+            state.probe_lo = state.probe_hi = None
+        return state
+
+
+# -----------------------------
+# Simulation
+# -----------------------------
+
+# Per level: (P(correct), P(correct) + P(minor)); the rest is incorrect
+VerdictDistribution = List[Tuple[float, float]]
+
+
+def uniform_distribution(p_correct: float, p_minor: float, levels: int = len(LEVELS)) -> VerdictDistribution:
+    return [(p_correct, p_correct + p_minor)] * levels
+
+
+def simulate(
+    engine: GameEngine,
+    games: int,
+    distribution: VerdictDistribution,
+    max_answers: int = 500,
+    seed: Optional[int] = None,
+) -> Dict:
+    """
+    Plays `games` synthetic games, drawing each verdict from the distribution
+    of the current level. A game still running after `max_answers` answers
+    ends with reason "max_answers".
+    Returns {"games", "answers", "end_reasons": {reason: n}, "final_levels": [n per level]}.
+    """
+    rand = random.Random(seed).random
+    step = engine.step
+    state = GameState()
+    end_reasons: Dict[str, int] = {}
+    final_levels = [0] * len(engine.levels)
+    answers = 0
+
+    for _ in range(games):
+        state.reset()
+        for _ in range(max_answers):
+            cut_correct, cut_minor = distribution[state.level]
+            r = rand()
+            step(state, CORRECT if r < cut_correct else MINOR if r < cut_minor else INCORRECT)
+            answers += 1
+            if state.ended:
+                break
+        else:
+            state.end_reason = "max_answers"
+
+        end_reasons[state.end_reason] = end_reasons.get(state.end_reason, 0) + 1
+        final_levels[state.level] += 1
+
+    return {"games": games, "answers": answers, "end_reasons": end_reasons, "final_levels": final_levels}
+
+
+def simulate_learners(
+    engine: GameEngine,
+    games: int,
+    informative: bool = True,
+    items_per_level: int = 200,
+    candidates: int = 8,
+    minor_share: float = 0.4,
+    placement: bool = False,
+    max_answers: int = 500,
+    seed: Optional[int] = None,
+) -> Dict:
+    """
+    Plays games (starting with start_placement() if `placement`) for simulated learners with a known true ability (uniform over
+    the scale) against an item bank whose true difficulties scatter around
+    their level's prior. Item estimates start at the prior and are learned
+    across games, as in production. With `informative`, each sentence is the
+    candidate (of `candidates` random unseen draws) whose estimated difficulty
+    is closest to the game's ability estimate; otherwise a uniform draw.
+    A wrong answer is "minor" with probability `minor_share`.
+
+    Returns {"games", "answers", "exact", "within_one", "abs_error", "by_level"}:
+    answers (one evaluation each, locked retries included), how often the
+    final level matches the learner's true level, and per true level
+    [{"games", "answers", "exact"}].
+    """
+    rng = random.Random(seed)
+    rand = rng.random
+    levels = len(engine.levels)
+    low, high = LEVEL_DIFFICULTY[0] - 0.5, LEVEL_DIFFICULTY[-1] + 0.5
+
+    true_b = [[LEVEL_DIFFICULTY[l] + rng.gauss(0.0, 0.35) for _ in range(items_per_level)] for l in range(levels)]
+    est_b = [[LEVEL_DIFFICULTY[l]] * items_per_level for l in range(levels)]
+    seen_n = [[0] * items_per_level for _ in range(levels)]
+
+    state = GameState()
+    answers = exact = within_one = abs_error = 0
+    by_level = [{"games": 0, "answers": 0, "exact": 0} for _ in range(levels)]
+
+    for _ in range(games):
+        state.reset()
+        if placement:
+            engine.start_placement(state)
+        true_ability = rng.uniform(low, high)
+        seen = set()
+        locked_item = None
+        game_answers = answers
+
+        for _ in range(max_answers):
+            level = state.level
+            if locked_item is not None:
+                item = locked_item
+            elif informative:
+                best = None
+                for _ in range(candidates):
+                    i = rng.randrange(items_per_level)
+                    if (level, i) in seen:
+                        continue
+                    gap = abs(est_b[level][i] - state.ability)
+                    if best is None or gap < best[0]:
+                        best = (gap, i)
+                item = best[1] if best else rng.randrange(items_per_level)
+            else:
+                item = rng.randrange(items_per_level)
+            seen.add((level, item))
+
+            p = expected_score(true_ability, true_b[level][item])
+            r = rand()
+            verdict = CORRECT if r < p else MINOR if r < p + (1 - p) * minor_share else INCORRECT
+            answers += 1
+
+            if locked_item is not None:
+                engine.step(state, verdict)
+                if state.locked_sentence_id is None:
+                    locked_item = None
+                continue
+
+            ability = state.ability
+            engine.step(state, verdict, item, est_b[level][item])
+            est_b[level][item] = update_difficulty(est_b[level][item], seen_n[level][item], ability, verdict)
+            seen_n[level][item] += 1
+            if state.ended:
+                break
+            if state.locked_sentence_id is not None:
+                locked_item = item
+
+        true_level = level_for_ability(true_ability, levels)
+        error = abs(state.level - true_level)
+        exact += error == 0
+        within_one += error <= 1
+        abs_error += error
+        row = by_level[true_level]
+        row["games"] += 1
+        row["answers"] += answers - game_answers
+        row["exact"] += error == 0
+
+    return {
+        "games": games,
+        "answers": answers,
+        "exact": exact / games,
+        "within_one": within_one / games,
+        "abs_error": abs_error / games,
+        "by_level": by_level,
+    }
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Optional, Any, Dict, Tuple
+
+from ai.cache import LRUCache
+from ai.evaluator import ensure_feedback_row
+from db import get_db_connection
+from game_engine import LEVEL_DIFFICULTY, LEVELS, GameEngine, GameState, update_difficulty
+
+# Uses of the ability/difficulty estimates (game_engine.py), each off until
+# evaluated with flask simulate-placement:
+#   ADAPTIVE_DIFFICULTY   - promotions jump to the estimated level, and games
+#                           end as "placed" (changes the game rules);
+#   INFORMATIVE_SENTENCES - the next sentence is the candidate whose estimated
+#                           difficulty is closest to the game's ability.
+# The estimates cost a sentence_stats read and write per turn, so they are only
+# kept while one of the two is on.
+ADAPTIVE_DIFFICULTY = os.getenv("ADAPTIVE_DIFFICULTY", "0") == "1"
+INFORMATIVE_SENTENCES = os.getenv("INFORMATIVE_SENTENCES", "0") == "1"
+TRACK_ABILITY = ADAPTIVE_DIFFICULTY or INFORMATIVE_SENTENCES
+engine = GameEngine(adaptive=ADAPTIVE_DIFFICULTY)
+
+# 'placement' starts with a binary search over LEVELS instead of at A1
+GAME_MODES = ("standard", "placement")
+
+# Active games kept in process, written through by the helpers below
+GAME_CACHE_SIZE = int(os.getenv("GAME_CACHE_SIZE", "4096"))
+_game_cache = LRUCache(GAME_CACHE_SIZE)
+
+
+# -----------------------------
+# DB helpers for games
+# -----------------------------
+# Helpers taking `conn` join the caller's transaction when one is given (no
+# commit); otherwise they run on the thread's connection and commit themselves.
+#
+# games.version is bumped by every update_game, so a reader that knows the
+# version it last saw (the session keeps it) can trust a cached copy that is
+# at least that new instead of re-reading the row. Writes made inside a
+# caller's transaction drop the cached copy; call invalidate_game() again
+# after committing.
+
+_GAME_COLUMNS = """
+    id, level, correct_streak, incorrect_streak, turns_at_level, last_sentence_id,
+    status, end_reason, started_ts, ended_ts, locked_sentence_id, locked_since, version,
+    ability, ability_info, mode, placement_lo, placement_hi
+"""
+
+
+class GameStateConflict(Exception):
+    """The game was written by someone else since the caller read it."""
+
+
+def _cache_game(game: Dict[str, Any]) -> None:
+    if game.get("status") == "active":
+        _game_cache.put(game["id"], game)
+    else:
+        _game_cache.pop(game["id"])
+
+
+def invalidate_game(game_id: int) -> None:
+    _game_cache.pop(game_id)
+
+
+def game_cache_stats() -> Dict[str, Any]:
+    return _game_cache.stats()
+
+
+def create_game(mode: str = "standard") -> Dict[str, Any]:
+    """Inserts a new game in the given mode (GAME_MODES) and returns its state."""
+    if mode not in GAME_MODES:
+        raise ValueError(f"Unknown game mode: {mode}")
+    started_ts = int(time.time())
+
+    state = GameState()
+    if mode == "placement":
+        engine.start_placement(state)
+
+    conn = get_db_connection()
+    row = conn.execute(
+        f"""
+        INSERT INTO games (level, correct_streak, incorrect_streak, turns_at_level,
+                           last_sentence_id, status, end_reason, started_ts, locked_sentence_id, locked_since,
+                           ability, mode, placement_lo, placement_hi)
+        VALUES (?, 0, 0, 0, NULL, 'active', NULL, ?, NULL, NULL, ?, ?, ?, ?)
+        RETURNING {_GAME_COLUMNS}
+        """,
+        (engine.levels[state.level], started_ts, state.ability, mode, state.probe_lo, state.probe_hi),
+    ).fetchone()
+    conn.commit()
+    game = dict(row)
+    _cache_game(game)
+    return dict(game)
+
+def get_game(
+    game_id: int,
+    conn: Optional[sqlite3.Connection] = None,
+    min_version: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the game as a dict. With min_version (and no conn) a cached copy
+    at least that new is returned without a query.
+    """
+    if conn is None and min_version is not None:
+        cached = _game_cache.get(game_id)
+        if cached is not None and cached["version"] >= min_version:
+            return dict(cached)
+
+    own = conn is None
+    if own:
+        conn = get_db_connection()
+    row = conn.execute(
+        f"SELECT {_GAME_COLUMNS} FROM games WHERE id = ?",
+        (game_id,),
+    ).fetchone()
+
+    if row is None:
+        _game_cache.pop(game_id)
+        return None
+
+    # Convert sqlite Row -> plain dict
+    game = dict(row)
+    if own:
+        _cache_game(game)
+    return dict(game)
+
+def insert_translation_attempt(
+    game_id: int,
+    *,
+    sentence_id: int,
+    level: str,
+    english_sentence: str,
+    user_norwegian: str,
+    verdict: str,
+    feedback_id: int,
+    eval_source: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    Insert a translation attempt row. Returns the attempt id.
+    sentence_stats is updated by a trigger in the same transaction.
+    """
+    own = conn is None
+    if own:
+        conn = get_db_connection()
+
+    cur = conn.execute(
+        """
+        INSERT INTO translation_attempts (
+            game_id,
+            sentence_id,
+            level,
+            english_sentence,
+            user_norwegian,
+            verdict,
+            feedback_id,
+            eval_source,
+            created_ts
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            game_id,
+            sentence_id,
+            level,
+            english_sentence,
+            user_norwegian,
+            verdict,
+            feedback_id,
+            eval_source,
+            int(time.time()),
+        ),
+    )
+    attempt_id = int(cur.lastrowid)
+    if own:
+        conn.commit()
+    return attempt_id
+
+
+
+def update_game(
+    game_id: int,
+    conn: Optional[sqlite3.Connection] = None,
+    *,
+    expected_version: Optional[int] = None,
+    **fields: Any,
+) -> Optional[int]:
+    """
+    Updates a game row with the provided fields and bumps its version.
+    With expected_version, only a row still at that version is written (the
+    version is bumped even without fields). Returns the new version (None if
+    nothing was written).
+
+    Example:
+        update_game(game_id, last_sentence_id=10, correct_streak=1)
+    """
+    if not fields and expected_version is None:
+        return None
+
+    allowed = {
+        "level",
+        "correct_streak",
+        "incorrect_streak",
+        "turns_at_level",
+        "last_sentence_id",
+        "status",
+        "end_reason",
+        "ended_ts",
+        "locked_sentence_id",
+        "locked_since",
+        "ability",
+        "ability_info",
+        "placement_lo",
+        "placement_hi",
+    }
+    for k in list(fields.keys()):
+        if k not in allowed:
+            raise ValueError(f"Disallowed field for games update: {k}")
+
+    cols = ", ".join([f"{k} = ?" for k in fields.keys()] + ["version = version + 1"])
+    vals = list(fields.values())
+    where = "id = ?"
+    params = [*vals, game_id]
+    if expected_version is not None:
+        where += " AND version = ?"
+        params.append(expected_version)
+
+    own = conn is None
+    if own:
+        conn = get_db_connection()
+    row = conn.execute(
+        f"UPDATE games SET {cols} WHERE {where} RETURNING version",
+        params,
+    ).fetchone()
+    if own:
+        conn.commit()
+
+    if row is None:
+        _game_cache.pop(game_id)
+        return None
+    version = int(row["version"])
+
+    cached = _game_cache.get(game_id) if own else None
+    if cached is not None and cached["version"] == version - 1:
+        _cache_game({**cached, **fields, "version": version})
+    else:
+        _game_cache.pop(game_id)
+    return version
+
+
+def end_game(game_id: int, reason: str, conn: Optional[sqlite3.Connection] = None) -> None:
+    update_game(game_id, conn, status="ended", end_reason=reason, ended_ts=int(time.time()))
+
+
+def turn_changes(
+    game_state: Dict[str, Any],
+    verdict: str,
+    sentence_id: int,
+    difficulty: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Applies the level/streak rules (game_engine.GameEngine) for one graded answer,
+    and updates the ability estimate when the sentence's difficulty is given.
+    Returns the games columns to update (empty if nothing changes).
+    """
+    state = engine.state_from_row(game_state)
+    was_locked = state.locked_sentence_id is not None
+    engine.step(state, verdict, sentence_id, difficulty)
+
+    if was_locked:
+        if state.locked_sentence_id is None:
+            return {"locked_sentence_id": None, "locked_since": None}
+        return {}
+
+    changes: Dict[str, Any] = {}
+    if state.locked_sentence_id is not None:
+        changes["locked_sentence_id"] = state.locked_sentence_id
+        changes["locked_since"] = datetime.now().isoformat(timespec="seconds")
+
+    changes.update(
+        level=engine.levels[state.level],
+        correct_streak=state.correct_streak,
+        incorrect_streak=state.incorrect_streak,
+        turns_at_level=state.turns_at_level,
+        placement_lo=state.probe_lo,
+        placement_hi=state.probe_hi,
+    )
+    if difficulty is not None:
+        changes.update(ability=state.ability, ability_info=state.information)
+    if state.ended:
+        changes.update(status="ended", end_reason=state.end_reason, ended_ts=int(time.time()))
+    else:
+        changes.update(status="active", end_reason=None, ended_ts=None)
+
+    return changes
+
+
+def record_turn(
+    game_id: int,
+    game_state: Dict[str, Any],
+    *,
+    sentence_id: int,
+    english_sentence: str,
+    user_norwegian: str,
+    evaluation,
+    feedback_id: int,
+    eval_source: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Saves the attempt, the game's new level/streak state and (with
+    TRACK_ABILITY) the ability and sentence difficulty estimates for one
+    graded answer in a single transaction.
+    Returns (final game state, attempt id) without re-reading the game.
+    Pass `conn` to make the turn part of the caller's transaction, which must
+    already hold the write lock (BEGIN IMMEDIATE).
+
+    The game row is only written if it is still at game_state["version"];
+    otherwise nothing is saved and GameStateConflict is raised (a double
+    submit, or a fallback POST for a turn another request already recorded).
+    """
+    verdict = evaluation.verdict
+
+    own = conn is None
+    if own:
+        conn = get_db_connection()
+        if not conn.in_transaction:
+            # Write lock first: the feedback row check below must hold until the insert
+            conn.execute("BEGIN IMMEDIATE")
+    try:
+        feedback_id = ensure_feedback_row(conn, game_state["level"], sentence_id, user_norwegian, evaluation, feedback_id)
+        attempt_id = insert_translation_attempt(
+            game_id,
+            sentence_id=sentence_id,
+            level=game_state["level"],
+            english_sentence=english_sentence,
+            user_norwegian=user_norwegian,
+            verdict=verdict,
+            feedback_id=feedback_id,
+            eval_source=eval_source,
+            conn=conn,
+        )
+
+        item = difficulty = None
+        if TRACK_ABILITY and not game_state.get("locked_sentence_id"):
+            # The attempt trigger has just created/counted the sentence_stats row
+            item = conn.execute(
+                "SELECT level, attempts, difficulty FROM sentence_stats WHERE sentence_id = ?",
+                (sentence_id,),
+            ).fetchone()
+        if item is not None:
+            difficulty = item["difficulty"]
+            if difficulty is None:
+                difficulty = LEVEL_DIFFICULTY[LEVELS.index(item["level"])]
+
+        changes = {
+            k: v for k, v in turn_changes(game_state, verdict, sentence_id, difficulty).items()
+            if game_state.get(k) != v
+        }
+        if difficulty is not None:
+            # Against the ability the answer was given with, not the updated one
+            ability = engine.state_from_row(game_state).ability
+            conn.execute(
+                "UPDATE sentence_stats SET difficulty = ? WHERE sentence_id = ?",
+                (update_difficulty(difficulty, item["attempts"] - 1, ability, verdict), sentence_id),
+            )
+
+        version = update_game(game_id, conn, expected_version=game_state["version"], **changes)
+        if version is None:
+            raise GameStateConflict(f"game {game_id} is no longer at version {game_state['version']}")
+        if own:
+            conn.commit()
+    except Exception:
+        if own:
+            conn.rollback()
+        raise
+
+    state = {**game_state, **changes, "version": version}
+    if own:
+        _cache_game(state)
+    return dict(state), attempt_id
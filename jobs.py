@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ai.evaluator import evaluate_translation
+from db import get_db_connection
+from games import get_game, invalidate_game, record_turn
+
+# Worker threads started by the web process; 0 = only enqueue (run `flask eval-worker` instead)
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "4"))
+JOB_POLL_S = float(os.getenv("EVAL_JOB_POLL_S", "0.5"))
+JOB_MAX_TRIES = int(os.getenv("EVAL_JOB_MAX_TRIES", "3"))
+# Lease on a claimed job: one left 'running' this long is assumed orphaned by a
+# dead worker and is claimed again by the next free worker
+JOB_STALE_S = int(os.getenv("EVAL_JOB_STALE_S", "300"))
+
+_wakeup = threading.Event()
+_workers: List[threading.Thread] = []
+_workers_lock = threading.Lock()
+
+
+# -----------------------------
+# Queue (evaluation_jobs table)
+# -----------------------------
+
+def enqueue_evaluation(
+    game_id: int,
+    *,
+    sentence_id: int,
+    level: str,
+    english_sentence: str,
+    user_norwegian: str,
+    game_version: Optional[int] = None,
+) -> int:
+    """
+    Queues one submitted answer for evaluation. Returns the job id.
+    game_version is the games.version the answer was given against; the turn
+    is only applied if the game is still at that version when the job completes.
+    """
+    conn = get_db_connection()
+    cur = conn.execute(
+        """
+        INSERT INTO evaluation_jobs (game_id, sentence_id, level, english_sentence, user_norwegian, game_version)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (game_id, sentence_id, level, english_sentence, user_norwegian, game_version),
+    )
+    conn.commit()
+    job_id = int(cur.lastrowid)
+
+    _wakeup.set()
+    return job_id
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    conn = get_db_connection()
+    row = conn.execute(
+        """
+        SELECT id, game_id, sentence_id, level, english_sentence, user_norwegian,
+               status, tries, attempt_id, error, created_at, started_at, finished_at
+        FROM evaluation_jobs
+        WHERE id = ?
+        """,
+        (job_id,),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def _claim_job() -> Optional[Dict[str, Any]]:
+    """
+    Claims the oldest job whose lease ran out (its worker died), else the oldest
+    queued one. tries doubles as the claim's token: a worker whose job was
+    claimed again can no longer finish or fail it.
+    """
+    conn = get_db_connection()
+    lease = f"-{JOB_STALE_S} seconds"
+    # Orphans that have used up their tries are not handed out again
+    conn.execute(
+        """
+        UPDATE evaluation_jobs
+        SET status = 'failed', error = 'worker lost', finished_at = datetime('now')
+        WHERE status = 'running'
+          AND started_at < datetime('now', ?)
+          AND tries >= ?
+        """,
+        (lease, JOB_MAX_TRIES),
+    )
+    row = conn.execute(
+        """
+        UPDATE evaluation_jobs
+        SET status = 'running', started_at = datetime('now'), tries = tries + 1
+        WHERE id = COALESCE(
+            (
+                SELECT id FROM evaluation_jobs
+                WHERE status = 'running' AND started_at < datetime('now', ?)
+                ORDER BY id
+                LIMIT 1
+            ),
+            (
+                SELECT id FROM evaluation_jobs
+                WHERE status = 'queued'
+                ORDER BY id
+                LIMIT 1
+            )
+        )
+        RETURNING id, game_id, sentence_id, level, english_sentence, user_norwegian, game_version, tries
+        """,
+        (lease,),
+    ).fetchone()
+    conn.commit()
+    return dict(row) if row else None
+
+
+def _owns_job(conn, job: Dict[str, Any]) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM evaluation_jobs WHERE id = ? AND status = 'running' AND tries = ?",
+        (job["id"], job["tries"]),
+    ).fetchone() is not None
+
+
+def _finish_job(job: Dict[str, Any], evaluation, feedback_id: int, source: Optional[str] = None) -> None:
+    """
+    Applies the turn (attempt insert + game updates) and marks the job done,
+    all in one transaction, if the game is still at the job's game_version.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+
+        if not _owns_job(conn, job):
+            # Our lease ran out and another worker has the job now
+            conn.rollback()
+            return
+
+        game_state = get_game(job["game_id"], conn)
+        error = None
+        if not game_state or game_state.get("status") != "active":
+            error = "game is no longer active"
+        elif job["game_version"] is not None and game_state["version"] != job["game_version"]:
+            # Another submit (or a retry of this answer) has recorded a turn since
+            error = "game changed since the answer was submitted"
+        if error is not None:
+            conn.execute(
+                """
+                UPDATE evaluation_jobs
+                SET status = 'failed', error = ?, finished_at = datetime('now')
+                WHERE id = ?
+                """,
+                (error, job["id"]),
+            )
+            conn.commit()
+            return
+
+        _, attempt_id = record_turn(
+            job["game_id"],
+            game_state,
+            sentence_id=job["sentence_id"],
+            english_sentence=job["english_sentence"],
+            user_norwegian=job["user_norwegian"],
+            evaluation=evaluation,
+            feedback_id=feedback_id,
+            eval_source=source,
+            conn=conn,
+        )
+        conn.execute(
+            """
+            UPDATE evaluation_jobs
+            SET status = 'done', attempt_id = ?, error = NULL, finished_at = datetime('now')
+            WHERE id = ?
+            """,
+            (attempt_id, job["id"]),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        # Readers may have cached the row while the transaction was open
+        invalidate_game(job["game_id"])
+
+
+def _fail_job(job: Dict[str, Any], error: str) -> None:
+    status = "queued" if job["tries"] < JOB_MAX_TRIES else "failed"
+    conn = get_db_connection()
+    conn.execute(
+        """
+        UPDATE evaluation_jobs
+        SET status = ?, error = ?,
+            finished_at = CASE WHEN ? = 'failed' THEN datetime('now') END
+        WHERE id = ? AND status = 'running' AND tries = ?
+        """,
+        (status, error[:500], status, job["id"], job["tries"]),
+    )
+    conn.commit()
+
+
+# -----------------------------
+# Workers
+# -----------------------------
+
+def run_one_job() -> bool:
+    """
+    Claims and processes a single queued job. Returns False if the queue was empty.
+    """
+    job = _claim_job()
+    if job is None:
+        return False
+
+    try:
+        evaluation, feedback_id, source = evaluate_translation(
+            job["level"],
+            job["english_sentence"],
+            job["user_norwegian"],
+            sentence_id=job["sentence_id"],
+            with_source=True,
+        )
+        if feedback_id is None:
+            raise RuntimeError("evaluate_translation returned no feedback_id")
+        _finish_job(job, evaluation, feedback_id, source)
+    except Exception as exc:
+        _fail_job(job, f"{type(exc).__name__}: {exc}")
+
+    return True
+
+
+def _worker_loop() -> None:
+    while True:
+        try:
+            if run_one_job():
+                continue
+        except Exception:
+            # DB busy or similar; back off and try again
+            time.sleep(JOB_POLL_S)
+            continue
+        _wakeup.wait(JOB_POLL_S)
+        _wakeup.clear()
+
+
+def start_evaluation_workers(count: int = EVAL_WORKERS) -> int:
+    """
+    Starts `count` daemon worker threads (once per process). Returns how many are running.
+    """
+    with _workers_lock:
+        if _workers or count <= 0:
+            return len(_workers)
+        for i in range(count):
+            t = threading.Thread(target=_worker_loop, name=f"eval-worker-{i}", daemon=True)
+            t.start()
+            _workers.append(t)
+        return len(_workers)
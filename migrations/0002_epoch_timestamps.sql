@@ -0,0 +1,19 @@
+-- Integer Unix-epoch timestamps for games and attempts.
+-- The TEXT columns were written in three formats (strftime, isoformat, SQLite
+-- localtime defaults), all local time; they are kept for old readers but no
+-- longer written by the app.
+
+ALTER TABLE games ADD COLUMN started_ts INTEGER;
+ALTER TABLE games ADD COLUMN ended_ts INTEGER;
+ALTER TABLE translation_attempts ADD COLUMN created_ts INTEGER;
+
+UPDATE games
+SET started_ts = COALESCE(CAST(strftime('%s', started_at, 'utc') AS INTEGER), 0),
+    ended_ts = CAST(strftime('%s', ended_at, 'utc') AS INTEGER);
+
+UPDATE translation_attempts
+SET created_ts = COALESCE(CAST(strftime('%s', created_at, 'utc') AS INTEGER), 0);
+
+-- Keyset pagination on /history: ORDER BY started_ts DESC, id DESC
+DROP INDEX IF EXISTS idx_games_started_at;
+CREATE INDEX IF NOT EXISTS idx_games_started_ts ON games(started_ts, id);
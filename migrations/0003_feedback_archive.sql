@@ -0,0 +1,9 @@
+-- translation_feedback retention (see `flask compact-feedback`).
+-- archived = 1: the row is from an obsolete MODEL_ID/PROMPT_VERSION and is only
+-- kept because attempts reference it, so it was slimmed down to what the
+-- history pages render.
+
+ALTER TABLE translation_feedback ADD COLUMN archived INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_feedback_version
+    ON translation_feedback(model_id, prompt_version);
@@ -0,0 +1,53 @@
+-- Compact translation_feedback (see ai/feedback_codec.py):
+--   signature TEXT UNIQUE + idx_feedback_lookup  ->  sig_key INTEGER UNIQUE
+--   translation_hash hex TEXT                    ->  32-byte BLOB
+--   feedback_json + translation_norm             ->  payload BLOB (packed)
+-- sig_key(), hash_blob() and pack_feedback() are registered by db.init_db.
+
+CREATE TABLE translation_feedback_v2 (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+
+    sig_key INTEGER NOT NULL UNIQUE,  -- signature_key() of the cache signature
+
+    level TEXT NOT NULL,
+    sentence_id INTEGER NOT NULL,
+    model_id TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    translation_hash BLOB NOT NULL,   -- SHA-256 of the normalized answer
+
+    verdict TEXT NOT NULL,            -- correct/minor/incorrect
+    payload BLOB NOT NULL,            -- pack_feedback(evaluation, normalized answer)
+
+    created_at TEXT NOT NULL DEFAULT (datetime('now','localtime')),
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    archived INTEGER NOT NULL DEFAULT 0,
+
+    FOREIGN KEY (sentence_id)
+        REFERENCES source_sentences(id)
+        ON DELETE CASCADE
+);
+
+INSERT INTO translation_feedback_v2 (
+    id, sig_key, level, sentence_id, model_id, prompt_version, translation_hash,
+    verdict, payload, created_at, hit_count, archived
+)
+SELECT
+    id, sig_key(signature), level, sentence_id, model_id, prompt_version, hash_blob(translation_hash),
+    verdict, pack_feedback(feedback_json, NULLIF(translation_norm, '')), created_at, hit_count, archived
+FROM translation_feedback;
+
+-- Keep AUTOINCREMENT from reusing ids of rows evicted earlier
+UPDATE sqlite_sequence
+SET seq = MAX(seq, COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'translation_feedback'), 0))
+WHERE name = 'translation_feedback_v2';
+
+INSERT INTO sqlite_sequence (name, seq)
+SELECT 'translation_feedback_v2', seq FROM sqlite_sequence
+WHERE name = 'translation_feedback'
+  AND NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'translation_feedback_v2');
+
+DROP TABLE translation_feedback;
+ALTER TABLE translation_feedback_v2 RENAME TO translation_feedback;
+
+CREATE INDEX IF NOT EXISTS idx_feedback_version
+    ON translation_feedback(model_id, prompt_version);
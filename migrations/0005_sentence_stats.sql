@@ -0,0 +1,84 @@
+-- Per-sentence difficulty statistics, maintained by a trigger in the same
+-- transaction as each translation_attempts insert (see /admin/sentence-stats).
+
+-- Where the attempt's evaluation came from: gold, gold_punctuation, cache,
+-- coalesced (shared an in-flight evaluation) or llm. NULL for older rows.
+ALTER TABLE translation_attempts ADD COLUMN eval_source TEXT;
+
+CREATE TABLE IF NOT EXISTS sentence_stats (
+    sentence_id INTEGER PRIMARY KEY,
+    level TEXT NOT NULL,
+
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    minor INTEGER NOT NULL DEFAULT 0,
+    incorrect INTEGER NOT NULL DEFAULT 0,
+
+    first_tries INTEGER NOT NULL DEFAULT 0,        -- first attempt at the sentence within a game
+    first_try_correct INTEGER NOT NULL DEFAULT 0,
+    distinct_answers INTEGER NOT NULL DEFAULT 0,   -- distinct feedback rows graded for it
+
+    sourced_attempts INTEGER NOT NULL DEFAULT 0,   -- attempts with a known eval_source
+    cache_hits INTEGER NOT NULL DEFAULT 0,         -- ...of which answered without an LLM call
+
+    last_attempt_ts INTEGER,
+
+    FOREIGN KEY (sentence_id)
+        REFERENCES source_sentences(id)
+        ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_sentence_stats_level ON sentence_stats(level);
+
+-- Backfill from existing attempts
+INSERT INTO sentence_stats (
+    sentence_id, level, attempts, correct, minor, incorrect,
+    first_tries, first_try_correct, distinct_answers, last_attempt_ts
+)
+SELECT
+    a.sentence_id,
+    MAX(s.level),
+    COUNT(*),
+    SUM(a.verdict = 'correct'),
+    SUM(a.verdict = 'minor'),
+    SUM(a.verdict = 'incorrect'),
+    SUM(a.rn = 1),
+    SUM(a.rn = 1 AND a.verdict = 'correct'),
+    COUNT(DISTINCT a.feedback_id),
+    MAX(a.created_ts)
+FROM (
+    SELECT ta.*,
+           ROW_NUMBER() OVER (PARTITION BY ta.game_id, ta.sentence_id ORDER BY ta.id) AS rn
+    FROM translation_attempts ta
+) a
+JOIN source_sentences s ON s.id = a.sentence_id
+GROUP BY a.sentence_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_translation_attempts_stats AFTER INSERT ON translation_attempts
+BEGIN
+    INSERT INTO sentence_stats (sentence_id, level)
+    SELECT NEW.sentence_id, level FROM source_sentences WHERE id = NEW.sentence_id
+    ON CONFLICT (sentence_id) DO NOTHING;
+
+    UPDATE sentence_stats
+    SET attempts = attempts + 1,
+        correct = correct + (NEW.verdict = 'correct'),
+        minor = minor + (NEW.verdict = 'minor'),
+        incorrect = incorrect + (NEW.verdict = 'incorrect'),
+        first_tries = first_tries + first.is_first,
+        first_try_correct = first_try_correct + (first.is_first AND NEW.verdict = 'correct'),
+        distinct_answers = distinct_answers + NOT EXISTS (
+            SELECT 1 FROM translation_attempts
+            WHERE feedback_id = NEW.feedback_id AND sentence_id = NEW.sentence_id AND id != NEW.id
+        ),
+        sourced_attempts = sourced_attempts + (NEW.eval_source IS NOT NULL),
+        cache_hits = cache_hits + (NEW.eval_source IS NOT NULL AND NEW.eval_source != 'llm'),
+        last_attempt_ts = NEW.created_ts
+    FROM (
+        SELECT NOT EXISTS (
+            SELECT 1 FROM translation_attempts
+            WHERE game_id = NEW.game_id AND sentence_id = NEW.sentence_id AND id != NEW.id
+        ) AS is_first
+    ) AS first
+    WHERE sentence_id = NEW.sentence_id;
+END;
@@ -0,0 +1,31 @@
+-- Normalized index of the issues inside translation_feedback payloads, so
+-- weak-area summaries are indexed aggregates instead of decoding every row.
+-- New feedback rows get their issues in _cache_put; rows that existed before
+-- this migration are filled in by `flask backfill-feedback-issues`.
+
+CREATE TABLE IF NOT EXISTS feedback_issues (
+    feedback_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,        -- index in evaluation.issues
+    category TEXT NOT NULL,
+    severity TEXT NOT NULL,           -- error/variant/style
+
+    PRIMARY KEY (feedback_id, position),
+    FOREIGN KEY (feedback_id)
+        REFERENCES translation_feedback(id)
+        ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_feedback_issues_category
+    ON feedback_issues(category, severity);
+
+CREATE INDEX IF NOT EXISTS idx_feedback_issues_severity
+    ON feedback_issues(severity, category);
+
+-- Per-period summaries start from the attempts in the window
+CREATE INDEX IF NOT EXISTS idx_translation_attempts_created_ts
+    ON translation_attempts(created_ts);
+
+-- Backfill walks ids in (cursor, upto]; later rows are indexed on insert
+INSERT OR REPLACE INTO app_meta (key, value) VALUES ('feedback_issues_backfill_cursor', '0');
+INSERT OR REPLACE INTO app_meta (key, value)
+SELECT 'feedback_issues_backfill_upto', COALESCE(MAX(id), 0) FROM translation_feedback;
@@ -0,0 +1,3 @@
+-- Bumped by games.update_game on every write, so processes holding a cached
+-- copy of an active game can tell whether it is stale.
+ALTER TABLE games ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,7 @@
+-- Elo-style estimates (see game_engine.py): each game's ability and the
+-- Fisher information behind it, and each sentence's difficulty. NULL means
+-- "not estimated yet" and reads as the prior of the level.
+ALTER TABLE games ADD COLUMN ability REAL;
+ALTER TABLE games ADD COLUMN ability_info REAL NOT NULL DEFAULT 0;
+
+ALTER TABLE sentence_stats ADD COLUMN difficulty REAL;
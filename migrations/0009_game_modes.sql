@@ -0,0 +1,6 @@
+-- 'standard' games start at A1; 'placement' games first binary-search the
+-- levels (placement_lo/placement_hi are the open search bounds as level
+-- indices, NULL once the search is over; see GameEngine.start_placement).
+ALTER TABLE games ADD COLUMN mode TEXT NOT NULL DEFAULT 'standard';
+ALTER TABLE games ADD COLUMN placement_lo INTEGER;
+ALTER TABLE games ADD COLUMN placement_hi INTEGER;
@@ -0,0 +1,3 @@
+-- games.version the answer was submitted against: the worker rejects the job
+-- if another submit has recorded a turn since (NULL for jobs queued before).
+ALTER TABLE evaluation_jobs ADD COLUMN game_version INTEGER;
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import os
+from typing import Optional
+
+from ai.cache import LRUCache
+
+
+class PageCache:
+    """
+    Rendered HTML keyed by (key, etag): a small in-process LRU in front of one
+    file per key on disk, so pages survive restarts and are shared between
+    worker processes. A new etag for a key replaces the old entry.
+    """
+
+    def __init__(self, directory: str, maxsize: int = 256):
+        self.directory = directory
+        self._memory = LRUCache(maxsize)
+
+    def _path(self, key: str, etag: str) -> str:
+        return os.path.join(self.directory, f"{key}.{etag}.html")
+
+    def get(self, key: str, etag: str) -> Optional[str]:
+        hit = self._memory.get(key)
+        if hit is not None and hit[0] == etag:
+            return hit[1]
+
+        try:
+            with open(self._path(key, etag), "r", encoding="utf-8") as f:
+                html = f.read()
+        except OSError:
+            return None
+        self._memory.put(key, (etag, html))
+        return html
+
+    def put(self, key: str, etag: str, html: str) -> None:
+        self._memory.put(key, (etag, html))
+
+        path = self._path(key, etag)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for stale in glob.glob(os.path.join(glob.escape(self.directory), f"{key}.*.html")):
+                if stale != path:
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass
+            # Write-then-rename so concurrent readers never see a partial page
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp, path)
+        except OSError:
+            # Disk cache is best effort; the in-process copy still serves
+            pass
+
+    def stats(self):
+        return self._memory.stats()
+
+
+def content_etag(*parts) -> str:
+    """Strong ETag value (unquoted) derived from the given parts."""
+    return hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:32]
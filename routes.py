@@ -1,207 +1,107 @@
 from __future__ import annotations
 
-from datetime import datetime
 from typing import Optional, Any, Dict
 
-from flask import render_template, request, redirect, url_for, session
-
-from db import get_db_connection
-from ai.evaluator import evaluate_translation
+import os
+import secrets
+import time
+from pathlib import Path
+
+from flask import Response, abort, jsonify, render_template, request, redirect, url_for, session, stream_with_context
+
+from db import get_db_connection, run_db
+from ai.evaluator import (
+    GOLD_HASH_HEX_LEN,
+    evaluate_translation_async,
+    feedback_cache_stats,
+    gold_answer_hashes,
+    iter_evaluation_events,
+    languagetool_cache_stats,
+    llm_usage_stats,
+    singleflight_stats,
+    weak_areas,
+)
+from games import (
+    GAME_MODES,
+    INFORMATIVE_SENTENCES,
+    LEVELS,
+    GameStateConflict,
+    create_game,
+    engine,
+    game_cache_stats,
+    get_game,
+    record_turn,
+    update_game,
+)
+from sentences import pick_sentence
+from jobs import enqueue_evaluation, get_job
+from page_cache import PageCache, content_etag
+from ai.feedback_codec import unpack_evaluation
 import json
 from collections import defaultdict
-from pprint import pprint
-
-LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
-
 
-def pick_sentence(level: str, avoid_id=None):
-    """
-    Picks a random English prompt from source_sentences for the given level.
-    avoid_id: last sentence id shown (DB id), to reduce immediate repeats.
-    Returns: {"id": int, "english": str}
-    """
-    connection = get_db_connection()
-    connection.execute("PRAGMA foreign_keys = ON;")
+# How game.html submits answers: "stream" (SSE), "queue" (background job + polling) or "inline"
+SUBMIT_MODE = os.getenv("SUBMIT_MODE", "stream")
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+HISTORY_CACHE_DIR = os.getenv("HISTORY_CACHE_DIR", "data/page_cache")
+HISTORY_CACHE_MAX_AGE_S = int(os.getenv("HISTORY_CACHE_MAX_AGE_S", "300"))
 
-    row = None
+# Rendered /history/<id> pages of ended games
+_history_pages = PageCache(HISTORY_CACHE_DIR)
+_HISTORY_TEMPLATE_HASH = content_etag(*(
+    (Path(__file__).parent / "templates" / name).read_text(encoding="utf-8")
+    for name in ("history_detail.html", "_header.html")
+))
 
-    if avoid_id is not None:
-        row = connection.execute(
-            """
-            SELECT id, sentence
-            FROM source_sentences
-            WHERE level = ?
-              AND id != ?
-            ORDER BY RANDOM()
-            LIMIT 1
-            """,
-            (level, avoid_id),
-        ).fetchone()
 
-    if row is None:
-        row = connection.execute(
-            """
-            SELECT id, sentence
-            FROM source_sentences
-            WHERE level = ?
-            ORDER BY RANDOM()
-            LIMIT 1
-            """,
-            (level,),
-        ).fetchone()
-
-    connection.close()
-
-    if row is None:
-        return {"id": 0, "english": ""}
-
-    return {"id": row["id"], "english": row["sentence"]}
-
-
-# -----------------------------
-# DB helpers for games
-# -----------------------------
+def _parse_history_cursor(value: Optional[str]) -> Optional[tuple]:
+    """Parses a /history "before" cursor ("<started_ts>:<id>"); None if absent or malformed."""
+    if not value:
+        return None
+    ts, _, game_id = value.partition(":")
+    try:
+        return int(ts), int(game_id)
+    except ValueError:
+        return None
 
-def create_game() -> int:
-    started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+def get_sentence_by_id(sentence_id: int) -> dict:
     conn = get_db_connection()
-    conn.execute("PRAGMA foreign_keys = ON;")
-    cur = conn.execute(
-        """
-        INSERT INTO games (level, correct_streak, incorrect_streak, turns_at_level,
-                           last_sentence_id, status, end_reason, started_at, locked_sentence_id, locked_since)
-        VALUES ('A1', 0, 0, 0, NULL, 'active', NULL, ?, NULL, NULL)
-        """,
-        (started_at,),
-    )
-    conn.commit()
-    game_id = cur.lastrowid
-    conn.close()
-    return int(game_id)
-
-def get_game(game_id: int) -> Optional[Dict[str, Any]]:
-    conn = get_db_connection()
-    conn.execute("PRAGMA foreign_keys = ON;")
-
     row = conn.execute(
-        """
-        SELECT id, level, correct_streak, incorrect_streak, turns_at_level, last_sentence_id,
-               status, end_reason, started_at, ended_at, locked_sentence_id, locked_since
-        FROM games
-        WHERE id = ?
-        """,
-        (game_id,),
+        "SELECT id, sentence FROM source_sentences WHERE id = ?",
+        (sentence_id,),
     ).fetchone()
+    if not row:
+        return {"id": 0, "english": ""}
+    return {"id": row["id"], "english": row["sentence"]}
 
-    conn.close()
-    if row is None:
-        return None
 
-    # Convert sqlite Row -> plain dict
-    return dict(row)
-
-def insert_translation_attempt(
-    game_id: int,
-    *,
-    sentence_id: int,
-    level: str,
-    english_sentence: str,
-    user_norwegian: str,
-    verdict: str,
-    feedback_id: int,
-) -> int:
+def _session_game(game_id) -> Optional[Dict[str, Any]]:
     """
-    Insert a translation attempt row. Returns the attempt id.
+    The session's game, from the in-process cache when it is at least as new
+    as the version this session last saw.
     """
-    conn = get_db_connection()
-    conn.execute("PRAGMA foreign_keys = ON;")
+    game_state = get_game(int(game_id), min_version=session.get("game_version"))
+    _remember_game_version(game_state)
+    return game_state
 
-    cur = conn.execute(
-        """
-        INSERT INTO translation_attempts (
-            game_id,
-            sentence_id,
-            level,
-            english_sentence,
-            user_norwegian,
-            verdict,
-            feedback_id
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            game_id,
-            sentence_id,
-            level,
-            english_sentence,
-            user_norwegian,
-            verdict,
-            feedback_id,
-        ),
-    )
-    conn.commit()
-    attempt_id = int(cur.lastrowid)
-    conn.close()
-    return attempt_id
 
+def _remember_game_version(game_state: Optional[Dict[str, Any]]) -> None:
+    if game_state and session.get("game_version") != game_state["version"]:
+        session["game_version"] = game_state["version"]
 
 
-def update_game(game_id: int, **fields: Any) -> None:
+def _is_stale_submit(game_state: Dict[str, Any]) -> bool:
     """
-    Updates a game row with the provided fields.
-
-    Example:
-        update_game(game_id, last_sentence_id=10, correct_streak=1)
+    True if a turn was recorded since the answer form was rendered (its
+    game_version field): a double submit, or a second path for the same answer.
     """
-    if not fields:
-        return
-
-    allowed = {
-        "level",
-        "correct_streak",
-        "incorrect_streak",
-        "turns_at_level",
-        "last_sentence_id",
-        "status",
-        "end_reason",
-        "ended_at",
-        "locked_sentence_id",
-        "locked_since",
-    }
-    for k in list(fields.keys()):
-        if k not in allowed:
-            raise ValueError(f"Disallowed field for games update: {k}")
-
-    cols = ", ".join([f"{k} = ?" for k in fields.keys()])
-    vals = list(fields.values())
+    raw = request.form.get("game_version", "")
+    return raw.isdigit() and int(raw) != game_state["version"]
 
-    conn = get_db_connection()
-    conn.execute("PRAGMA foreign_keys = ON;")
-    conn.execute(
-        f"UPDATE games SET {cols} WHERE id = ?",
-        (*vals, game_id),
-    )
-    conn.commit()
-    conn.close()
-
-
-def end_game(game_id: int, reason: str) -> None:
-    # ended_at stored as ISO string consistent with your code style
-    ended_at = datetime.now().isoformat(timespec="seconds")
-    update_game(game_id, status="ended", end_reason=reason, ended_at=ended_at)
-
-def get_sentence_by_id(sentence_id: int) -> dict:
-    conn = get_db_connection()
-    conn.execute("PRAGMA foreign_keys = ON;")
-    row = conn.execute(
-        "SELECT id, sentence FROM source_sentences WHERE id = ?",
-        (sentence_id,),
-    ).fetchone()
-    conn.close()
-    if not row:
-        return {"id": 0, "english": ""}
-    return {"id": row["id"], "english": row["sentence"]}
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
 # -----------------------------
@@ -215,8 +115,10 @@ def register_routes(app):
 
     @app.route("/game/start", methods=["POST"])
     def game_start():
-        game_id = create_game()
-        session["game_id"] = game_id
+        mode = request.form.get("mode", "standard")
+        game_state = create_game(mode if mode in GAME_MODES else "standard")
+        session["game_id"] = game_state["id"]
+        session["game_version"] = game_state["version"]
         return redirect(url_for("game"))
 
     @app.route("/game", methods=["GET"])
@@ -225,7 +127,7 @@ def register_routes(app):
         if not game_id:
             return redirect(url_for("index"))
 
-        game_state = get_game(int(game_id))
+        game_state = _session_game(game_id)
         if not game_state:
             session.pop("game_id", None)
             return redirect(url_for("index"))
@@ -240,34 +142,43 @@ def register_routes(app):
         else:
             sentence = pick_sentence(
                 game_state["level"],
+                game_id=int(game_id),
                 avoid_id=game_state.get("last_sentence_id"),
+                ability=engine.state_from_row(game_state).ability if INFORMATIVE_SENTENCES else None,
             )
-            update_game(int(game_id), last_sentence_id=sentence["id"])
 
+        # persist last_sentence_id (a reload of a locked sentence changes nothing)
+        if game_state.get("last_sentence_id") != sentence["id"]:
+            game_state["version"] = update_game(int(game_id), last_sentence_id=sentence["id"])
+            game_state["last_sentence_id"] = sentence["id"]
+            _remember_game_version(game_state)
 
-        # persist last_sentence_id
-        update_game(int(game_id), last_sentence_id=sentence["id"])
-
-        # refresh game state (optional, but keeps template context accurate)
-        game_state["last_sentence_id"] = sentence["id"]
+        # Lets the page show an exact gold answer as correct before the server answers
+        gold_salt = secrets.token_hex(8)
 
         context = {
             **game_state,
             "game_id": int(game_id),
             "sentence_id": sentence["id"],
             "english_sentence": sentence["english"],
+            "submit_mode": SUBMIT_MODE,
+            "gold_salt": gold_salt,
+            "gold_hashes": gold_answer_hashes(sentence["id"], gold_salt),
+            "gold_hash_len": GOLD_HASH_HEX_LEN,
         }
         return render_template("game.html", **context)
 
     @app.route("/game/submit", methods=["POST"])
-    def game_submit():
+    async def game_submit():
         game_id = session.get("game_id")
         if not game_id:
             return redirect(url_for("index"))
 
-        game_state = get_game(int(game_id))
+        game_state = await run_db(_session_game, game_id)
         if not game_state or game_state.get("status") != "active":
             return redirect(url_for("index"))
+        if _is_stale_submit(game_state):
+            return redirect(url_for("game"))
 
         user_norwegian = request.form.get("norwegian", "").strip()
         english_sentence = request.form.get("english_sentence", "").strip()
@@ -281,34 +192,35 @@ def register_routes(app):
             # This should not happen in your game flow; fail loudly while developing
             raise ValueError("Missing sentence_id on submit; cannot save translation_attempt")
 
-        evaluation, feedback_id = evaluate_translation(
+        evaluation, feedback_id, source = await evaluate_translation_async(
             game_state["level"],
             english_sentence,
             user_norwegian,
             sentence_id=sentence_id,
+            with_source=True,
         )
 
         if feedback_id is None:
-            raise RuntimeError("evaluate_translation returned no feedback_id")
-
-        verdict = evaluation.verdict
+            raise RuntimeError("evaluate_translation_async returned no feedback_id")
 
-        # Save attempt immediately (before redirect/render)
-        insert_translation_attempt(
-            int(game_id),
-            sentence_id=sentence_id,
-            level=game_state["level"],
-            english_sentence=english_sentence,
-            user_norwegian=user_norwegian,
-            verdict=verdict,
-            feedback_id=feedback_id,
-        )
+        try:
+            game_state, _ = await run_db(
+                record_turn,
+                int(game_id),
+                game_state,
+                sentence_id=sentence_id,
+                english_sentence=english_sentence,
+                user_norwegian=user_norwegian,
+                evaluation=evaluation,
+                feedback_id=feedback_id,
+                eval_source=source,
+            )
+        except GameStateConflict:
+            # An overlapping submit recorded this turn while we were grading
+            return redirect(url_for("game"))
+        _remember_game_version(game_state)
 
-        locked_id = game_state.get("locked_sentence_id")
-        if locked_id:
-            if verdict == "correct":
-                update_game(int(game_id), locked_sentence_id=None, locked_since=None)
-            return render_template(
+        return render_template(
             "feedback.html",
             **game_state,
             english_sentence=english_sentence,
@@ -316,83 +228,167 @@ def register_routes(app):
             evaluation=evaluation.model_dump(),
         )
 
-        # Update counters (in memory first)
-        turns_at_level = int(game_state["turns_at_level"]) + 1
-        correct_streak = int(game_state["correct_streak"])
-        incorrect_streak = int(game_state["incorrect_streak"])
-        level = game_state["level"]
+    @app.route("/game/submit/stream", methods=["POST"])
+    def game_submit_stream():
+        """
+        Same as /game/submit, but answers with Server-Sent Events:
+          verdict  - evaluation from the gold/cache paths, as soon as it is known
+          lt       - LanguageTool findings before the LLM is asked
+          partial  - LLM fields (corrected, issues, short_rule, ...) as they stream in
+          done     - rendered feedback.html once the turn is saved
+          recorded - the turn is saved (by this or an overlapping submit) but
+                     its feedback could not be sent; the client should load
+                     `url` instead (never re-submit)
+          error    - nothing was saved; the client should fall back to /game/submit
+        """
+        game_id = session.get("game_id")
+        if not game_id:
+            return redirect(url_for("index"))
 
-        # lock if answer not correct
-        if verdict != "correct":
-            update_game(
-                int(game_id),
-                locked_sentence_id=sentence_id,
-                locked_since=datetime.now().isoformat(timespec="seconds"),
-            )
+        game_state = _session_game(game_id)
+        if not game_state or game_state.get("status") != "active":
+            return redirect(url_for("index"))
+        if _is_stale_submit(game_state):
+            return redirect(url_for("game"))
 
-        if verdict == "correct":
-            correct_streak += 1
-            incorrect_streak = 0
-        elif verdict == "incorrect":
-            incorrect_streak += 1
-            correct_streak = 0
-        else:  # minor
-            correct_streak = 0
-            incorrect_streak = 0
-
-        ended = False
-        reason = None
-
-        if incorrect_streak >= 2:
-            ended = True
-            reason = "two_incorrect"
-        elif turns_at_level >= 5 and correct_streak < 2:
-            ended = True
-            reason = "no_progress"
-
-        # Level up logic
-        if not ended and correct_streak >= 2:
-            idx = LEVELS.index(level)
-            if idx < len(LEVELS) - 1:
-                level = LEVELS[idx + 1]
-
-            # Reset for next level
-            correct_streak = 0
-            incorrect_streak = 0
-            turns_at_level = 0
-
-        # Persist state
-        if ended and reason:
-            end_game(int(game_id), reason)
-            update_game(
-                int(game_id),
-                level=level,
-                correct_streak=correct_streak,
-                incorrect_streak=incorrect_streak,
-                turns_at_level=turns_at_level,
-            )
-        else:
-            update_game(
-                int(game_id),
-                level=level,
-                correct_streak=correct_streak,
-                incorrect_streak=incorrect_streak,
-                turns_at_level=turns_at_level,
-                status="active",
-                end_reason=None,
-                ended_at=None,
-            )
+        user_norwegian = request.form.get("norwegian", "").strip()
+        english_sentence = request.form.get("english_sentence", "").strip()
+
+        sentence_id_raw = request.form.get("sentence_id")
+        if not (sentence_id_raw and str(sentence_id_raw).isdigit()):
+            raise ValueError("Missing sentence_id on submit; cannot save translation_attempt")
+        sentence_id = int(sentence_id_raw)
+        next_url = url_for("game")
+
+        # The turn is saved after the response has started, too late to update
+        # the session: make the next read go to the row instead of any cached copy
+        session.pop("game_version", None)
+
+        def events():
+            recorded = False
+            try:
+                evaluation = feedback_id = source = None
+                for name, data in iter_evaluation_events(
+                    game_state["level"],
+                    english_sentence,
+                    user_norwegian,
+                    sentence_id=sentence_id,
+                ):
+                    if name == "final":
+                        evaluation, feedback_id, source = data["evaluation"], data["feedback_id"], data["source"]
+                        yield _sse("verdict", {"source": source, "evaluation": evaluation.model_dump()})
+                    else:
+                        yield _sse(name, data)
+
+                if evaluation is None or feedback_id is None:
+                    raise RuntimeError("evaluation stream ended without a feedback_id")
+
+                final_state, _ = record_turn(
+                    int(game_id),
+                    game_state,
+                    sentence_id=sentence_id,
+                    english_sentence=english_sentence,
+                    user_norwegian=user_norwegian,
+                    evaluation=evaluation,
+                    feedback_id=feedback_id,
+                    eval_source=source,
+                )
+                recorded = True
+                html = render_template(
+                    "feedback.html",
+                    **final_state,
+                    english_sentence=english_sentence,
+                    user_norwegian=user_norwegian,
+                    evaluation=evaluation.model_dump(),
+                )
+                yield _sse("done", {"html": html})
+            except GameStateConflict:
+                yield _sse("recorded", {"url": next_url})
+            except Exception:
+                app.logger.exception("Streamed submit failed for game %s", game_id)
+                # A fallback POST after the turn was saved would record it twice
+                if recorded:
+                    yield _sse("recorded", {"url": next_url})
+                else:
+                    yield _sse("error", {"message": "evaluation failed"})
+
+        return Response(
+            stream_with_context(events()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.route("/game/submit/queue", methods=["POST"])
+    def game_submit_queue():
+        """
+        Queues the answer for the evaluation workers and returns 202 with the
+        URLs to poll. The turn is applied by the worker when the job completes.
+        """
+        game_id = session.get("game_id")
+        if not game_id:
+            return jsonify({"error": "no active game"}), 400
 
-        # Reload final state for rendering
-        game_state = get_game(int(game_id)) or {}
-        # If ended_at/end_reason are useful in template, they’ll be present.
+        game_state = _session_game(game_id)
+        if not game_state or game_state.get("status") != "active":
+            return jsonify({"error": "no active game"}), 400
+        if _is_stale_submit(game_state):
+            return jsonify({"error": "game changed", "url": url_for("game")}), 409
+
+        sentence_id_raw = request.form.get("sentence_id")
+        if not (sentence_id_raw and str(sentence_id_raw).isdigit()):
+            return jsonify({"error": "missing sentence_id"}), 400
+
+        job_id = enqueue_evaluation(
+            int(game_id),
+            sentence_id=int(sentence_id_raw),
+            level=game_state["level"],
+            english_sentence=request.form.get("english_sentence", "").strip(),
+            user_norwegian=request.form.get("norwegian", "").strip(),
+            game_version=game_state["version"],
+        )
+        return jsonify({
+            "job_id": job_id,
+            "status_url": url_for("game_job_status", job_id=job_id),
+            "feedback_url": url_for("game_job_feedback", job_id=job_id),
+        }), 202
+
+    def _session_job(job_id: int):
+        job = get_job(job_id)
+        if job is None or job["game_id"] != session.get("game_id"):
+            abort(404)
+        return job
+
+    @app.route("/game/jobs/<int:job_id>", methods=["GET"])
+    def game_job_status(job_id: int):
+        job = _session_job(job_id)
+        return jsonify({"status": job["status"], "error": job["error"] if job["status"] == "failed" else None})
+
+    @app.route("/game/jobs/<int:job_id>/feedback", methods=["GET"])
+    def game_job_feedback(job_id: int):
+        job = _session_job(job_id)
+        if job["status"] != "done" or job["attempt_id"] is None:
+            return redirect(url_for("game"))
 
+        conn = get_db_connection()
+        row = conn.execute(
+            """
+            SELECT ta.english_sentence, ta.user_norwegian, tf.payload
+            FROM translation_attempts ta
+            JOIN translation_feedback tf ON tf.id = ta.feedback_id
+            WHERE ta.id = ?
+            """,
+            (job["attempt_id"],),
+        ).fetchone()
+
+        # The worker may have run in another process: read the row, not the cache
+        game_state = get_game(job["game_id"]) or {}
+        _remember_game_version(game_state)
         return render_template(
             "feedback.html",
             **game_state,
-            english_sentence=english_sentence,
-            user_norwegian=user_norwegian,
-            evaluation=evaluation.model_dump(),
+            english_sentence=row["english_sentence"],
+            user_norwegian=row["user_norwegian"],
+            evaluation=unpack_evaluation(row["payload"]),
         )
 
     @app.route("/game/next", methods=["POST"])
@@ -401,7 +397,7 @@ def register_routes(app):
         if not game_id:
             return redirect(url_for("index"))
 
-        game_state = get_game(int(game_id))
+        game_state = _session_game(game_id)
         if game_state and game_state.get("status") == "ended":
             return redirect(url_for("game_result"))
 
@@ -413,45 +409,159 @@ def register_routes(app):
         if not game_id:
             return redirect(url_for("index"))
 
-        game_state = get_game(int(game_id))
+        game_state = _session_game(game_id)
         if not game_state or game_state.get("status") != "ended":
             return redirect(url_for("index"))
 
         return render_template("game_result.html", **game_state)
 
-    @app.route("/history", methods=["GET"])
-    def history():
-        conn = get_db_connection()
-        conn.execute("PRAGMA foreign_keys = ON;")
+    @app.route("/admin/eval-stats", methods=["GET"])
+    def admin_eval_stats():
+        # Counters are per process
+        return jsonify({
+            "llm": llm_usage_stats(),
+            "singleflight": singleflight_stats(),
+            "feedback_cache": feedback_cache_stats(),
+            "game_cache": game_cache_stats(),
+            "languagetool_cache": languagetool_cache_stats(),
+        })
+
+    @app.route("/admin/weak-areas", methods=["GET"])
+    def admin_weak_areas():
+        """
+        Most frequent issue categories, for one game (?game_id=) or for the
+        attempts of the last ?days= days (default 30).
+        """
+        game_id = request.args.get("game_id", type=int)
+        if game_id is not None:
+            return jsonify({"game_id": game_id, "weak_areas": weak_areas(game_id=game_id)})
+
+        days = request.args.get("days", 30, type=int)
+        since_ts = int(time.time()) - days * 86400
+        return jsonify({"days": days, "weak_areas": weak_areas(since_ts=since_ts)})
+
+    @app.route("/admin/sentence-stats", methods=["GET"])
+    def admin_sentence_stats():
+        """
+        Hardest sentences per level, read only from sentence_stats (maintained
+        by a trigger on translation_attempts) plus a PK lookup for the text.
+        """
+        level = request.args.get("level", "A1")
+        if level not in LEVELS:
+            abort(404)
+        min_attempts = request.args.get("min_attempts", 3, type=int)
+        limit = min(request.args.get("limit", 100, type=int), 1000)
 
-        games = conn.execute(
+        conn = get_db_connection()
+        levels = conn.execute(
             """
-            SELECT
-                id,
-                level,
-                status,
-                end_reason,
-                started_at,
-                ended_at
-            FROM games
-            ORDER BY datetime(started_at) DESC, id DESC
-            LIMIT 200
+            SELECT level,
+                   COUNT(*) AS sentences,
+                   SUM(attempts) AS attempts,
+                   SUM(correct) AS correct,
+                   SUM(minor) AS minor,
+                   SUM(incorrect) AS incorrect,
+                   SUM(first_tries) AS first_tries,
+                   SUM(first_try_correct) AS first_try_correct,
+                   SUM(sourced_attempts) AS sourced_attempts,
+                   SUM(cache_hits) AS cache_hits
+            FROM sentence_stats
+            GROUP BY level
+            ORDER BY level
+            """
+        ).fetchall()
+        sentences = conn.execute(
+            """
+            SELECT st.*, s.sentence,
+                   CAST(st.first_try_correct AS REAL) / NULLIF(st.first_tries, 0) AS first_try_rate,
+                   CAST(st.cache_hits AS REAL) / NULLIF(st.sourced_attempts, 0) AS cache_hit_rate
+            FROM sentence_stats st
+            JOIN source_sentences s ON s.id = st.sentence_id
+            WHERE st.level = ? AND st.attempts >= ?
+            ORDER BY first_try_rate ASC, st.attempts DESC
+            LIMIT ?
+            """,
+            (level, min_attempts, limit),
+        ).fetchall()
+        modes = conn.execute(
+            """
+            SELECT g.mode,
+                   COUNT(*) AS games,
+                   AVG(COALESCE(a.answers, 0)) AS answers,
+                   AVG(COALESCE(a.llm_calls, 0)) AS llm_calls,
+                   AVG(CASE g.level WHEN 'A1' THEN 0 WHEN 'A2' THEN 1 WHEN 'B1' THEN 2
+                                    WHEN 'B2' THEN 3 WHEN 'C1' THEN 4 ELSE 5 END) AS level_index
+            FROM games g
+            LEFT JOIN (
+                SELECT game_id, COUNT(*) AS answers, SUM(eval_source = 'llm') AS llm_calls
+                FROM translation_attempts
+                GROUP BY game_id
+            ) a ON a.game_id = g.id
+            WHERE g.status = 'ended'
+            GROUP BY g.mode
+            ORDER BY g.mode
             """
         ).fetchall()
 
-        conn.close()
+        return render_template(
+            "admin_sentence_stats.html",
+            modes=modes,
+            levels=levels,
+            sentences=sentences,
+            level=level,
+            all_levels=LEVELS,
+            min_attempts=min_attempts,
+        )
 
-        return render_template("history.html", games=games)
+    @app.route("/history", methods=["GET"])
+    def history():
+        conn = get_db_connection()
+
+        # Keyset pagination: ?before=<started_ts>:<id> of the last game on the previous page
+        before = _parse_history_cursor(request.args.get("before"))
+        if before is None:
+            games = conn.execute(
+                """
+                SELECT id, level, status, end_reason, started_ts, ended_ts, mode
+                FROM games
+                ORDER BY started_ts DESC, id DESC
+                LIMIT ?
+                """,
+                (HISTORY_PAGE_SIZE + 1,),
+            ).fetchall()
+        else:
+            games = conn.execute(
+                """
+                SELECT id, level, status, end_reason, started_ts, ended_ts, mode
+                FROM games
+                WHERE (started_ts, id) < (?, ?)
+                ORDER BY started_ts DESC, id DESC
+                LIMIT ?
+                """,
+                (*before, HISTORY_PAGE_SIZE + 1),
+            ).fetchall()
+
+        next_cursor = None
+        if len(games) > HISTORY_PAGE_SIZE:
+            games = games[:HISTORY_PAGE_SIZE]
+            last = games[-1]
+            next_cursor = f"{last['started_ts']}:{last['id']}"
+
+        return render_template(
+            "history.html",
+            games=games,
+            next_cursor=next_cursor,
+            is_first_page=before is None,
+        )
 
     @app.route("/history/<int:game_id>", methods=["GET"])
     def history_detail(game_id: int):
         conn = get_db_connection()
-        conn.execute("PRAGMA foreign_keys = ON;")
 
         game = conn.execute(
             """
             SELECT id, level, correct_streak, incorrect_streak, turns_at_level,
-                status, end_reason, started_at, ended_at
+                status, end_reason, started_ts, ended_ts, mode
             FROM games
             WHERE id = ?
             """,
@@ -459,37 +569,68 @@ def register_routes(app):
         ).fetchone()
 
         if game is None:
-            conn.close()
             return redirect(url_for("history"))
 
+        if game["status"] != "ended":
+            return _render_history_detail(conn, game)
+
+        # An ended game's page only changes if its rows do; the ETag covers the
+        # game row, its attempts, their feedback (compact_feedback re-packs it
+        # when archiving) and the template, so it doubles as the cache key.
+        stats = conn.execute(
+            """
+            SELECT COUNT(*) AS n,
+                   COALESCE(MAX(ta.id), 0) AS max_id,
+                   COALESCE(SUM(ta.feedback_id), 0) AS feedback_sum,
+                   COALESCE(SUM(tf.archived), 0) AS archived
+            FROM translation_attempts ta
+            LEFT JOIN translation_feedback tf ON tf.id = ta.feedback_id
+            WHERE ta.game_id = ?
+            """,
+            (game_id,),
+        ).fetchone()
+        etag = content_etag(_HISTORY_TEMPLATE_HASH, *tuple(game), *tuple(stats))
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            key = f"history-{game_id}"
+            html = _history_pages.get(key, etag)
+            if html is None:
+                html = _render_history_detail(conn, game)
+                _history_pages.put(key, etag, html)
+            response = Response(html, mimetype="text/html")
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"private, max-age={HISTORY_CACHE_MAX_AGE_S}, must-revalidate"
+        return response
+
+    def _render_history_detail(conn, game) -> str:
         rows = conn.execute(
             """
             SELECT
                 ta.id AS attempt_id,
                 ta.level AS attempt_level,
-                ta.created_at,
+                ta.created_ts,
                 ta.sentence_id,
                 ta.english_sentence,
                 ta.user_norwegian,
                 ta.verdict,
-                tf.feedback_json
+                tf.payload
             FROM translation_attempts ta
             JOIN translation_feedback tf ON tf.id = ta.feedback_id
             WHERE ta.game_id = ?
             ORDER BY ta.id ASC
             """,
-            (game_id,),
+            (game["id"],),
         ).fetchall()
 
-        conn.close()
-        print(rows)
-
         # Group attempts by level and decode evaluation JSON for template use
         grouped = defaultdict(list)
         for r in rows:
             d = dict(r)
             try:
-                d["evaluation"] = json.loads(d["feedback_json"]) if d.get("feedback_json") else {}
+                d["evaluation"] = unpack_evaluation(d.pop("payload"))
             except Exception:
                 d["evaluation"] = {}
             grouped[d["attempt_level"]].append(d)
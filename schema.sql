@@ -103,6 +103,9 @@ CREATE TABLE IF NOT EXISTS translation_attempts (
 CREATE INDEX IF NOT EXISTS idx_translation_attempts_game_id
     ON translation_attempts(game_id);
 
+CREATE INDEX IF NOT EXISTS idx_translation_attempts_feedback_id
+    ON translation_attempts(feedback_id);
+
 
 -- Idempotency / data quality:
 CREATE UNIQUE INDEX IF NOT EXISTS idx_source_sentences_unique
@@ -112,4 +115,89 @@ CREATE UNIQUE INDEX IF NOT EXISTS idx_valid_translations_unique
     ON valid_translations(sentence_id, translation);
 
 CREATE INDEX IF NOT EXISTS idx_valid_translations_sentence_id
-    ON valid_translations(sentence_id);
\ No newline at end of file
+    ON valid_translations(sentence_id);
+
+-- Corpus versioning: bumped on any change to the sentence/translation corpus so
+-- in-process indexes (e.g. the gold translation index) know when to rebuild.
+CREATE TABLE IF NOT EXISTS app_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+INSERT OR IGNORE INTO app_meta (key, value) VALUES ('corpus_version', '0');
+
+CREATE TRIGGER IF NOT EXISTS trg_source_sentences_insert AFTER INSERT ON source_sentences
+BEGIN
+    UPDATE app_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'corpus_version';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_sentences_update AFTER UPDATE ON source_sentences
+BEGIN
+    UPDATE app_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'corpus_version';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_source_sentences_delete AFTER DELETE ON source_sentences
+BEGIN
+    UPDATE app_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'corpus_version';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_valid_translations_insert AFTER INSERT ON valid_translations
+BEGIN
+    UPDATE app_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'corpus_version';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_valid_translations_update AFTER UPDATE ON valid_translations
+BEGIN
+    UPDATE app_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'corpus_version';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_valid_translations_delete AFTER DELETE ON valid_translations
+BEGIN
+    UPDATE app_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'corpus_version';
+END;
+
+
+-- LanguageTool responses keyed by normalized text + LT_VERSION (raw matches only)
+CREATE TABLE IF NOT EXISTS languagetool_results (
+    text_hash TEXT NOT NULL,          -- SHA-256 (hex) of the normalized text sent to LT
+    lt_version TEXT NOT NULL,         -- LT_VERSION at the time of the check
+    matches_json TEXT NOT NULL,       -- raw "matches" array from /v2/check
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+
+    PRIMARY KEY (text_hash, lt_version)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_languagetool_results_created_at
+    ON languagetool_results(created_at);
+
+-- Durable queue of submitted answers waiting for evaluation (see jobs.py)
+CREATE TABLE IF NOT EXISTS evaluation_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+
+    game_id INTEGER NOT NULL,
+    sentence_id INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    english_sentence TEXT NOT NULL,
+    user_norwegian TEXT NOT NULL,
+
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    tries INTEGER NOT NULL DEFAULT 0,
+    attempt_id INTEGER NULL,          -- translation_attempts row written when done
+    error TEXT NULL,
+
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    started_at TEXT NULL,
+    finished_at TEXT NULL,
+
+    FOREIGN KEY (game_id)
+        REFERENCES games(id)
+        ON DELETE CASCADE,
+
+    FOREIGN KEY (attempt_id)
+        REFERENCES translation_attempts(id)
+        ON DELETE SET NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_status
+    ON evaluation_jobs(status, id);
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from db import get_corpus_version, get_db_connection, on_corpus_change
+from game_engine import LEVEL_DIFFICULTY, LEVELS
+
+# How often (seconds) a process re-checks corpus_version for imports done elsewhere
+SENTENCE_INDEX_RECHECK_S = float(os.getenv("SENTENCE_INDEX_RECHECK_S", "30"))
+# Random draws before falling back to scanning the level for unseen ids
+_MAX_DRAWS = 16
+# Unseen candidates compared by difficulty when picking for a known ability
+_CANDIDATES = 8
+
+# level -> source_sentences ids, in a compact array so 100k+ ids per level stay cheap
+SentenceIndex = Dict[str, "array[int]"]
+
+_index_lock = threading.Lock()
+_index: Optional[SentenceIndex] = None
+_index_version: Optional[int] = None
+_index_checked_at = 0.0
+
+
+def _build_sentence_index() -> Tuple[SentenceIndex, int]:
+    conn = get_db_connection()
+    version = get_corpus_version(conn)
+    index: SentenceIndex = {}
+    for row in conn.execute("SELECT id, level FROM source_sentences ORDER BY id"):
+        index.setdefault(row["level"], array("q")).append(row["id"])
+    return index, version
+
+
+def _get_sentence_index() -> SentenceIndex:
+    global _index, _index_version, _index_checked_at
+
+    index = _index
+    now = time.monotonic()
+    if index is not None and now - _index_checked_at < SENTENCE_INDEX_RECHECK_S:
+        return index
+
+    with _index_lock:
+        if _index is not None and now - _index_checked_at < SENTENCE_INDEX_RECHECK_S:
+            return _index
+
+        if _index is not None:
+            version = get_corpus_version(get_db_connection())
+            if version == _index_version:
+                _index_checked_at = now
+                return _index
+
+        _index, _index_version = _build_sentence_index()
+        _index_checked_at = time.monotonic()
+        return _index
+
+
+@on_corpus_change
+def invalidate_sentence_index() -> None:
+    global _index, _index_version
+    with _index_lock:
+        _index = None
+        _index_version = None
+
+
+def seen_sentence_ids(game_id: int) -> Set[int]:
+    """
+    Sentence ids already answered in this game (uses idx_translation_attempts_game_id).
+    """
+    rows = get_db_connection().execute(
+        "SELECT DISTINCT sentence_id FROM translation_attempts WHERE game_id = ?",
+        (game_id,),
+    ).fetchall()
+    return {int(r["sentence_id"]) for r in rows}
+
+
+def _most_informative(level: str, candidates: List[int], ability: float) -> int:
+    """The candidate whose estimated difficulty is closest to `ability`."""
+    prior = LEVEL_DIFFICULTY[LEVELS.index(level)]
+    placeholders = ", ".join("?" for _ in candidates)
+    difficulty = {
+        row["sentence_id"]: row["difficulty"]
+        for row in get_db_connection().execute(
+            f"SELECT sentence_id, difficulty FROM sentence_stats WHERE sentence_id IN ({placeholders})",
+            candidates,
+        )
+    }
+    return min(
+        candidates,
+        key=lambda i: abs((difficulty.get(i) if difficulty.get(i) is not None else prior) - ability),
+    )
+
+
+def choose_sentence_id(
+    level: str,
+    seen: Iterable[int] = (),
+    avoid_id: Optional[int] = None,
+    ability: Optional[float] = None,
+) -> Optional[int]:
+    """
+    Random sentence id for `level` that is not in `seen` (nor avoid_id).
+
+    Draws uniformly from the level's id array and rejects seen ids, so the cost
+    does not depend on the level size while the game has seen only a small part
+    of it. When the level is (nearly) exhausted it falls back to the unseen ids,
+    then to anything but avoid_id, then to anything. None if the level is empty.
+
+    With `ability`, up to _CANDIDATES unseen draws are compared and the one
+    whose difficulty estimate is closest to it (the most informative) wins.
+    """
+    ids = _get_sentence_index().get(level)
+    if not ids:
+        return None
+
+    excluded = set(seen)
+    if avoid_id is not None:
+        excluded.add(avoid_id)
+
+    candidates: List[int] = []
+    for _ in range(_MAX_DRAWS):
+        candidate = ids[random.randrange(len(ids))]
+        if candidate not in excluded:
+            if ability is None:
+                return candidate
+            excluded.add(candidate)
+            candidates.append(candidate)
+            if len(candidates) == _CANDIDATES:
+                break
+    if candidates:
+        return _most_informative(level, candidates, ability)
+
+    # Rejection kept hitting seen ids: only likely when the level is small
+    unseen = [i for i in ids if i not in excluded]
+    if unseen:
+        return random.choice(unseen)
+
+    fresh = [i for i in ids if i != avoid_id]
+    return random.choice(fresh or ids)
+
+
+def pick_sentence(
+    level: str,
+    game_id: Optional[int] = None,
+    avoid_id: Optional[int] = None,
+    ability: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Picks a random English prompt for the given level, skipping sentences
+    already answered in game_id and the last one shown (avoid_id); with
+    `ability`, the most informative of a few random candidates.
+    Returns: {"id": int, "english": str}
+    """
+    seen = seen_sentence_ids(game_id) if game_id is not None else set()
+    for _ in range(2):
+        sentence_id = choose_sentence_id(level, seen, avoid_id, ability)
+        if sentence_id is None:
+            break
+        row = get_db_connection().execute(
+            "SELECT id, sentence FROM source_sentences WHERE id = ?",
+            (sentence_id,),
+        ).fetchone()
+        if row is not None:
+            return {"id": row["id"], "english": row["sentence"]}
+        # Deleted since the index was built (other process); rebuild and retry once
+        invalidate_sentence_index()
+
+    return {"id": 0, "english": ""}
@@ -0,0 +1,30 @@
+// Client-side twin of ai/evaluator.py:_normalize_nb. Any change here or there
+// must keep static/normalize_vectors.json passing on both sides
+// (`flask check-normalize-vectors`).
+(function (root) {
+  // Exactly the characters Python's str.isspace() accepts (what \s and
+  // strip() use there); JS \s differs (adds ﻿, lacks \x1c-\x1f and \x85)
+  const WS = "\\t\\n\\v\\f\\r\\x1c-\\x1f \\x85\\xa0\\u1680\\u2000-\\u200a\\u2028\\u2029\\u202f\\u205f\\u3000";
+  const TRIM = new RegExp("^[" + WS + "]+|[" + WS + "]+$", "g");
+  const RUNS = new RegExp("[" + WS + "]+", "g");
+
+  function normalizeNb(s) {
+    s = (s || "").replace(TRIM, "");
+    s = s.replace(/[“”]/g, '"').replace(/[’‘]/g, "'");
+    s = s.replace(RUNS, " ");
+    s = s.replace(TRIM, "").replace(/[.!?]+$/, "");
+    return s.toLowerCase();
+  }
+
+  // Hex SHA-256 of salt + normalized answer, cut to the length the server sends
+  async function goldHash(salt, answer, length) {
+    const bytes = new TextEncoder().encode(salt + normalizeNb(answer));
+    const digest = await crypto.subtle.digest("SHA-256", bytes);
+    const hex = Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, "0")).join("");
+    return hex.slice(0, length);
+  }
+
+  const api = { normalizeNb, goldHash };
+  if (typeof module !== "undefined" && module.exports) module.exports = api;
+  else root.Normalize = api;
+})(this);
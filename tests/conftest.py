@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time: point the app at a throwaway data dir
+# before any test module imports it
+_DATA_DIR = tempfile.mkdtemp(prefix="norsk-tests-")
+os.environ["APP_DB_PATH"] = os.path.join(_DATA_DIR, "app.db")
+os.environ["HISTORY_CACHE_DIR"] = os.path.join(_DATA_DIR, "page_cache")
+os.environ.setdefault("FLASK_SECRET_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The migrated, seeded test database (shared by all tests: create your own rows)."""
+    import db
+
+    db.init_db()
+    db.seed_db()
+    return db.DB_PATH
+
+
+@pytest.fixture
+def conn(database):
+    import db
+
+    return db.get_db_connection()
+
+
+@pytest.fixture
+def sentence(conn):
+    """An A1 sentence from the seed corpus: {"id", "english", "level"}."""
+    row = conn.execute(
+        "SELECT id, sentence, level FROM source_sentences WHERE level = 'A1' ORDER BY id LIMIT 1"
+    ).fetchone()
+    return {"id": row["id"], "english": row["sentence"], "level": row["level"]}
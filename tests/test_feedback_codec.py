@@ -0,0 +1,63 @@
+import pytest
+
+from ai.feedback_codec import pack_feedback, signature_key, unpack_evaluation, unpack_feedback
+
+EVALUATION = {
+    "verdict": "minor",
+    "meaning": "same",
+    "corrected": "Jeg bor i Norge.",
+    "issues": [
+        {"category": "tegnsetting", "severity": "style", "explanation": "Punktum mangler.", "fix": "Norge."},
+    ],
+    "short_rule": "Husk punktum.",
+}
+
+# pack_feedback(EVALUATION, "jeg bor i norge") as stored by format 1: rows
+# written in this format must keep decoding
+STORED_V1 = bytes.fromhex(
+    "01abc66b3316c3bc52d31592f28b143215fcf28bd253f5900daf56c29900b1442a6a0c0694e6659794e602"
+    "43362f3d27b5480f1ea3506b6ad15dee515a9cad5000d105521d9f98575c0e4cbc564a597027e681f42ad50200"
+)
+
+
+@pytest.mark.parametrize("answer_norm", [None, "jeg bor i norge", "ærlig talt – «sitat»"])
+def test_round_trip(answer_norm):
+    assert unpack_feedback(pack_feedback(EVALUATION, answer_norm)) == (EVALUATION, answer_norm)
+
+
+def test_round_trip_without_issues():
+    evaluation = {**EVALUATION, "issues": []}
+    assert unpack_evaluation(pack_feedback(evaluation, "jeg bor i norge")) == evaluation
+
+
+def test_stored_payloads_still_decode():
+    assert unpack_feedback(STORED_V1) == (EVALUATION, "jeg bor i norge")
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="format"):
+        unpack_feedback(b"\x07" + pack_feedback(EVALUATION)[1:])
+
+
+def test_unpack_evaluation_of_nothing():
+    assert unpack_evaluation(None) == {}
+    assert unpack_evaluation(b"") == {}
+
+
+@pytest.mark.parametrize(
+    "signature, key",
+    [
+        # sig_key is stored in translation_feedback: these values must never change
+        ("A1-12-gpt-5-nano-2025-08-07-grading-v1.1-0123456789ab-nb", 9068018776466400967),
+        ("", -2039914840885289964),
+        ("ÆØÅ", -3634855080228169433),
+    ],
+)
+def test_signature_key_is_stable(signature, key):
+    assert signature_key(signature) == key
+
+
+def test_signature_key_fits_sqlite_integer():
+    keys = [signature_key(f"A1-{i}-model-v1-{i:012x}-nb") for i in range(2000)]
+    assert all(-(2**63) <= k < 2**63 for k in keys)
+    assert len(set(keys)) == len(keys)
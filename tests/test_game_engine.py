@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from game_engine import CORRECT, INCORRECT, LEVELS, MINOR, GameEngine, GameState
+from games import turn_changes
+
+
+def baseline_turn(game, verdict, sentence_id):
+    """
+    The level/streak rules as /game/submit applied them before GameEngine
+    existed, on a games-row-like dict. Returns the new dict.
+    """
+    game = dict(game)
+    if game["locked_sentence_id"]:
+        if verdict == CORRECT:
+            game["locked_sentence_id"] = None
+        return game
+
+    game["turns_at_level"] += 1
+    if verdict != CORRECT:
+        game["locked_sentence_id"] = sentence_id
+    if verdict == CORRECT:
+        game["correct_streak"] += 1
+        game["incorrect_streak"] = 0
+    elif verdict == INCORRECT:
+        game["incorrect_streak"] += 1
+        game["correct_streak"] = 0
+    else:
+        game["correct_streak"] = game["incorrect_streak"] = 0
+
+    if game["incorrect_streak"] >= 2:
+        game["status"], game["end_reason"] = "ended", "two_incorrect"
+    elif game["turns_at_level"] >= 5 and game["correct_streak"] < 2:
+        game["status"], game["end_reason"] = "ended", "no_progress"
+    elif game["correct_streak"] >= 2:
+        game["level"] = LEVELS[min(LEVELS.index(game["level"]) + 1, len(LEVELS) - 1)]
+        game["correct_streak"] = game["incorrect_streak"] = game["turns_at_level"] = 0
+    return game
+
+
+def _new_game():
+    return {
+        "level": "A1",
+        "correct_streak": 0,
+        "incorrect_streak": 0,
+        "turns_at_level": 0,
+        "locked_sentence_id": None,
+        "status": "active",
+        "end_reason": None,
+    }
+
+
+def _as_row(engine, state):
+    return {
+        "level": engine.levels[state.level],
+        "correct_streak": state.correct_streak,
+        "incorrect_streak": state.incorrect_streak,
+        "turns_at_level": state.turns_at_level,
+        "locked_sentence_id": state.locked_sentence_id,
+        "status": "ended" if state.ended else "active",
+        "end_reason": state.end_reason,
+    }
+
+
+def _random_games(seed, games=2000, max_answers=60):
+    """Yields verdict sequences; skewed towards correct so games reach the top level too."""
+    rng = random.Random(seed)
+    for _ in range(games):
+        p_correct = rng.uniform(0.3, 0.95)
+        yield [
+            CORRECT if rng.random() < p_correct else rng.choice((MINOR, INCORRECT))
+            for _ in range(max_answers)
+        ]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_step_matches_the_baseline_rules(seed):
+    engine = GameEngine()
+    for verdicts in _random_games(seed):
+        game, state = _new_game(), GameState()
+        for sentence_id, verdict in enumerate(verdicts, start=1):
+            if game["locked_sentence_id"]:
+                sentence_id = game["locked_sentence_id"]
+            game = baseline_turn(game, verdict, sentence_id)
+            engine.step(state, verdict, sentence_id)
+            assert _as_row(engine, state) == game, (verdicts, sentence_id)
+            if game["status"] == "ended":
+                break
+
+
+@pytest.mark.parametrize("seed", [4])
+def test_turn_changes_match_the_baseline_rules(seed):
+    for verdicts in _random_games(seed, games=300):
+        game = row = _new_game()
+        for sentence_id, verdict in enumerate(verdicts, start=1):
+            if game["locked_sentence_id"]:
+                sentence_id = game["locked_sentence_id"]
+            game = baseline_turn(game, verdict, sentence_id)
+            row = {**row, **turn_changes(row, verdict, sentence_id)}
+            assert {k: row[k] for k in game} == game, (verdicts, sentence_id)
+            if game["status"] == "ended":
+                break
+
+
+def _play(verdicts, state=None):
+    engine = GameEngine()
+    state = state or GameState()
+    for sentence_id, verdict in enumerate(verdicts, start=1):
+        engine.step(state, verdict, state.locked_sentence_id or sentence_id)
+    return state
+
+
+def test_two_correct_in_a_row_promote():
+    state = _play([CORRECT, CORRECT])
+    assert (state.level, state.correct_streak, state.turns_at_level) == (1, 0, 0)
+
+
+def test_top_level_is_kept_on_promotion():
+    state = _play([CORRECT, CORRECT], GameState(level=len(LEVELS) - 1, turns_at_level=3))
+    assert (state.level, state.turns_at_level, state.ended) == (len(LEVELS) - 1, 0, False)
+
+
+def test_locked_answers_only_unlock():
+    state = _play([INCORRECT, INCORRECT, MINOR])
+    assert (state.incorrect_streak, state.turns_at_level, state.locked_sentence_id) == (1, 1, 1)
+    state = _play([CORRECT], state)
+    assert (state.incorrect_streak, state.turns_at_level, state.locked_sentence_id) == (1, 1, None)
+
+
+def test_two_incorrect_in_a_row_end_the_game():
+    state = _play([INCORRECT, CORRECT, INCORRECT])
+    assert (state.ended, state.end_reason) == (True, "two_incorrect")
+
+
+def test_five_turns_without_a_streak_end_the_game():
+    state = _play([CORRECT, MINOR, CORRECT, CORRECT, MINOR, CORRECT, MINOR])
+    assert (state.ended, state.end_reason, state.turns_at_level) == (True, "no_progress", 5)
@@ -0,0 +1,59 @@
+import html
+import re
+
+import pytest
+
+import routes
+from routes import _parse_history_cursor
+
+# Later than any game the other tests start, so these are the newest rows
+STARTED_TS = 4_000_000_000
+
+
+@pytest.fixture
+def client(database):
+    from app import app
+
+    return app.test_client()
+
+
+def _insert_games(conn, started_ts, n):
+    ids = [
+        conn.execute(
+            "INSERT INTO games (level, status, started_ts) VALUES ('A1', 'ended', ?)", (started_ts,)
+        ).lastrowid
+        for _ in range(n)
+    ]
+    conn.commit()
+    return ids
+
+
+def _page(client, url):
+    """(game ids in page order, URL of the next page or None)"""
+    body = client.get(url).get_data(as_text=True)
+    ids = [int(i) for i in re.findall(r'href="/history/(\d+)"', body)]
+    older = re.search(r'href="(/history\?before=[^"]+)"', body)
+    return ids, html.unescape(older.group(1)) if older else None
+
+
+def test_pages_split_inside_a_run_of_equal_start_times(client, conn, monkeypatch):
+    monkeypatch.setattr(routes, "HISTORY_PAGE_SIZE", 2)
+    same_second = _insert_games(conn, STARTED_TS, 5)
+    second_before = _insert_games(conn, STARTED_TS - 1, 2)
+    expected = sorted(same_second, reverse=True) + sorted(second_before, reverse=True)
+
+    seen, url = [], "/history"
+    while url is not None and len(seen) < len(expected):
+        ids, url = _page(client, url)
+        assert len(ids) <= 2
+        seen.extend(ids)
+
+    assert seen[: len(expected)] == expected
+
+
+def test_cursor_parsing():
+    assert _parse_history_cursor("1700000000:42") == (1700000000, 42)
+    assert _parse_history_cursor(None) is None
+    assert _parse_history_cursor("") is None
+    assert _parse_history_cursor("1700000000") is None
+    assert _parse_history_cursor("abc:1") is None
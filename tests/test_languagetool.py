@@ -0,0 +1,191 @@
+import asyncio
+import time
+
+import pytest
+
+from ai.languagetool import CircuitBreaker, LanguageToolClient, LanguageToolUnavailable
+from ai.lt_stub import serve_stub
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**kwargs):
+        server, endpoint = serve_stub(**kwargs)
+        servers.append(server)
+        return endpoint
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _check(client, text="Jeg bor i Norge."):
+    async def run():
+        try:
+            return await client.check(text)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def _trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_s=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_s=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_s=0.05)
+    _trip(breaker)
+    time.sleep(0.06)
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_s=0.05)
+    _trip(breaker)
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_client_records_failures_from_stub(stub):
+    endpoint = stub(fail_rate=1.0)
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_s=60)
+    client = LanguageToolClient(endpoint, "nb", breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(LanguageToolUnavailable):
+            _check(client)
+    assert breaker.state == "open"
+
+    with pytest.raises(LanguageToolUnavailable, match="circuit is open"):
+        _check(client)
+
+
+def test_client_success_closes_half_open_circuit(stub):
+    endpoint = stub(flagged=["Norge"])
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_s=0.05)
+    _trip(breaker)
+    time.sleep(0.06)
+
+    data = _check(LanguageToolClient(endpoint, "nb", breaker=breaker))
+    assert [m["rule"]["issueType"] for m in data["matches"]] == ["misspelling"]
+    assert breaker.state == "closed"
+
+
+def test_cancelled_trial_frees_the_half_open_slot(stub):
+    endpoint = stub(latency_s=1.0)
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_s=0.05)
+    client = LanguageToolClient(endpoint, "nb", breaker=breaker)
+    _trip(breaker)
+    time.sleep(0.06)
+
+    async def cancel_trial():
+        task = asyncio.create_task(client.check("Jeg bor i Norge."))
+        await asyncio.sleep(0.2)
+        assert not breaker.allow()  # the trial holds the slot
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await client.aclose()
+
+    asyncio.run(cancel_trial())
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_cancelled_closed_call_leaves_a_later_trial_alone(stub):
+    endpoint = stub(latency_s=1.0)
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_s=0.05)
+    client = LanguageToolClient(endpoint, "nb", breaker=breaker)
+
+    async def cancel_call():
+        task = asyncio.create_task(client.check("Jeg bor i Norge."))
+        await asyncio.sleep(0.2)
+        # Meanwhile the circuit opens, cools down and another call takes the trial
+        _trip(breaker)
+        await asyncio.sleep(0.06)
+        assert breaker.allow()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await client.aclose()
+
+    asyncio.run(cancel_call())
+
+    assert not breaker.allow()
+
+
+def test_acquire_reports_the_trial_slot():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_s=0.05)
+    assert breaker.acquire() == (True, False)
+
+    _trip(breaker)
+    assert breaker.acquire() == (False, False)
+
+    time.sleep(0.06)
+    assert breaker.acquire() == (True, True)
+    assert breaker.acquire() == (False, False)
+
+
+class _CooldownEndsDuringCheck(CircuitBreaker):
+    """Reports "open" to any state read, as if read just before the cool-down ran out."""
+
+    @property
+    def state(self) -> str:
+        return "open"
+
+
+def test_cancelled_trial_is_released_when_cooldown_ends_mid_check(stub):
+    endpoint = stub(latency_s=1.0)
+    breaker = _CooldownEndsDuringCheck(failure_threshold=1, cooldown_s=0.05)
+    client = LanguageToolClient(endpoint, "nb", breaker=breaker)
+    _trip(breaker)
+    time.sleep(0.06)
+
+    async def cancel_trial():
+        task = asyncio.create_task(client.check("Jeg bor i Norge."))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await client.aclose()
+
+    asyncio.run(cancel_trial())
+
+    assert breaker.allow()
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+import db
+from ai.feedback_codec import signature_key, unpack_feedback
+
+V1_FEEDBACK = {
+    "verdict": "minor",
+    "meaning": "same",
+    "corrected": "Jeg bor i Norge.",
+    "issues": [],
+    "short_rule": "Husk punktum.",
+}
+
+
+@pytest.fixture
+def empty_db(tmp_path, monkeypatch):
+    """Points this thread's connection at a new database file for the test."""
+    db.close_db_connection()
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "app.db"))
+    yield db.get_db_connection()
+    db.close_db_connection()
+
+
+@pytest.fixture
+def v1_db(empty_db):
+    """A database at user_version 1 (schema.sql only) holding one answered turn."""
+    with open(os.path.join(os.path.dirname(db.__file__), db.MIGRATIONS[0]), encoding="utf-8") as f:
+        for statement in db._sql_statements(f.read()):
+            empty_db.execute(statement)
+    empty_db.execute("PRAGMA user_version = 1")
+
+    sentence_id = empty_db.execute(
+        "INSERT INTO source_sentences (level, sentence) VALUES ('A1', 'I live in Norway.')"
+    ).lastrowid
+    game_id = empty_db.execute(
+        "INSERT INTO games (level, started_at) VALUES ('A1', '2025-01-02 03:04:05')"
+    ).lastrowid
+    norm = "jeg bor i norge"
+    feedback_id = empty_db.execute(
+        """
+        INSERT INTO translation_feedback (level, sentence_id, model_id, prompt_version,
+                                          translation_norm, translation_hash, signature,
+                                          verdict, feedback_json)
+        VALUES ('A1', ?, 'model', 'v1', ?, ?, 'A1-sig', 'minor', ?)
+        """,
+        (sentence_id, norm, hashlib.sha256(norm.encode()).hexdigest(), json.dumps(V1_FEEDBACK)),
+    ).lastrowid
+    empty_db.execute(
+        """
+        INSERT INTO translation_attempts (game_id, sentence_id, level, english_sentence,
+                                          user_norwegian, verdict, feedback_id)
+        VALUES (?, ?, 'A1', 'I live in Norway.', 'Jeg bor i Norge', 'minor', ?)
+        """,
+        (game_id, sentence_id, feedback_id),
+    )
+    empty_db.commit()
+    return empty_db
+
+
+def _user_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _columns(conn, table):
+    return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_empty_database_is_migrated_to_the_latest_version(empty_db):
+    db.init_db()
+
+    assert _user_version(empty_db) == len(db.MIGRATIONS)
+    assert {"started_ts", "version", "ability", "mode", "placement_lo"} <= _columns(empty_db, "games")
+    assert {"sig_key", "payload", "archived"} <= _columns(empty_db, "translation_feedback")
+    assert "game_version" in _columns(empty_db, "evaluation_jobs")
+    assert empty_db.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+
+def test_v1_database_is_migrated_with_its_data(v1_db):
+    db.init_db()
+
+    assert _user_version(v1_db) == len(db.MIGRATIONS)
+    assert v1_db.execute("PRAGMA foreign_key_check").fetchall() == []
+
+    game = v1_db.execute("SELECT started_ts, version, mode FROM games").fetchone()
+    assert game["started_ts"] > 0
+    assert (game["version"], game["mode"]) == (0, "standard")
+
+    feedback = v1_db.execute("SELECT id, sig_key, translation_hash, payload FROM translation_feedback").fetchone()
+    assert feedback["sig_key"] == signature_key("A1-sig")
+    assert feedback["translation_hash"] == hashlib.sha256(b"jeg bor i norge").digest()
+    assert unpack_feedback(feedback["payload"]) == (V1_FEEDBACK, "jeg bor i norge")
+
+    attempt = v1_db.execute("SELECT feedback_id, created_ts FROM translation_attempts").fetchone()
+    assert attempt["feedback_id"] == feedback["id"]
+    assert attempt["created_ts"] > 0
+
+
+def test_migrating_again_is_a_no_op(v1_db):
+    db.init_db()
+    schema = v1_db.execute("SELECT name, sql FROM sqlite_master ORDER BY name").fetchall()
+
+    db.init_db()
+
+    assert _user_version(v1_db) == len(db.MIGRATIONS)
+    assert v1_db.execute("SELECT name, sql FROM sqlite_master ORDER BY name").fetchall() == schema
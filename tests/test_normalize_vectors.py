@@ -0,0 +1,62 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from ai import evaluator
+from ai.evaluator import GOLD_HASH_HEX_LEN, _normalize_nb, _SentenceGold, gold_answer_hashes
+
+STATIC = Path(__file__).resolve().parent.parent / "static"
+VECTORS_PATH = STATIC / "normalize_vectors.json"
+VECTORS = json.loads(VECTORS_PATH.read_text(encoding="utf-8"))
+
+# Same checks against static/normalize.js; exits non-zero on any mismatch
+_NODE_SCRIPT = """
+const { normalizeNb, goldHash } = require(process.argv[1]);
+const vectors = require(process.argv[2]);
+(async () => {
+  let failures = 0;
+  for (const v of vectors.normalize) {
+    const got = normalizeNb(v.input);
+    if (got !== v.expected) { failures++; console.log("normalize", JSON.stringify(v.input), JSON.stringify(got)); }
+  }
+  for (const v of vectors.hash) {
+    const got = await goldHash(v.salt, v.answer, v.length);
+    if (got !== v.expected) { failures++; console.log("hash", JSON.stringify(v.answer), got); }
+  }
+  process.exit(failures ? 1 : 0);
+})();
+"""
+
+
+def test_vectors_are_not_empty():
+    assert VECTORS["normalize"]
+    assert VECTORS["hash"]
+
+
+@pytest.mark.parametrize("vector", VECTORS["normalize"], ids=lambda v: repr(v["input"]))
+def test_normalize_nb(vector):
+    assert _normalize_nb(vector["input"]) == vector["expected"]
+
+
+@pytest.mark.parametrize("vector", VECTORS["hash"], ids=lambda v: repr(v["answer"]))
+def test_gold_answer_hashes(vector, monkeypatch):
+    assert vector["length"] == GOLD_HASH_HEX_LEN
+    gold = _SentenceGold()
+    gold.exact[_normalize_nb(vector["answer"])] = (vector["answer"], 0)
+    monkeypatch.setattr(evaluator, "_get_gold_index", lambda: {1: gold})
+
+    assert gold_answer_hashes(1, vector["salt"]) == [vector["expected"]]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_normalize_js():
+    result = subprocess.run(
+        [shutil.which("node"), "-e", _NODE_SCRIPT, str(STATIC / "normalize.js"), str(VECTORS_PATH)],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,92 @@
+import uuid
+
+import pytest
+
+import games
+from ai.evaluator import Evaluation, _cache_put
+from games import GameStateConflict, create_game, get_game, record_turn
+
+
+def _evaluation(verdict):
+    return Evaluation(verdict=verdict, meaning="same", corrected="Jeg bor i Norge.", short_rule="Husk V2.")
+
+
+@pytest.fixture
+def turn(conn, sentence):
+    """A fresh game and the arguments of one graded answer to it."""
+    game = create_game()
+    answer = f"Jeg bor i Norge {uuid.uuid4().hex}"
+    evaluation = _evaluation("correct")
+    return game, {
+        "sentence_id": sentence["id"],
+        "english_sentence": sentence["english"],
+        "user_norwegian": answer,
+        "evaluation": evaluation,
+        "feedback_id": _cache_put(sentence["level"], sentence["id"], answer, evaluation),
+    }
+
+
+def _attempts(conn, game_id):
+    return conn.execute("SELECT COUNT(*) FROM translation_attempts WHERE game_id = ?", (game_id,)).fetchone()[0]
+
+
+def _times_answered(conn, sentence_id):
+    row = conn.execute("SELECT attempts FROM sentence_stats WHERE sentence_id = ?", (sentence_id,)).fetchone()
+    return row["attempts"] if row else 0
+
+
+def test_turn_is_saved_with_the_game_update(conn, turn):
+    game, kwargs = turn
+    answered = _times_answered(conn, kwargs["sentence_id"])
+
+    state, attempt_id = record_turn(game["id"], game, **kwargs)
+
+    row = conn.execute("SELECT game_id, verdict, feedback_id FROM translation_attempts WHERE id = ?", (attempt_id,)).fetchone()
+    assert (row["game_id"], row["verdict"], row["feedback_id"]) == (game["id"], "correct", kwargs["feedback_id"])
+    assert _times_answered(conn, kwargs["sentence_id"]) == answered + 1
+
+    stored = get_game(game["id"])
+    assert stored["version"] == state["version"] == game["version"] + 1
+    assert stored["correct_streak"] == state["correct_streak"] == 1
+    assert not conn.in_transaction
+
+
+def test_failure_after_the_attempt_rolls_the_turn_back(conn, turn, monkeypatch):
+    game, kwargs = turn
+    answered = _times_answered(conn, kwargs["sentence_id"])
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(games, "update_game", fail)
+    with pytest.raises(RuntimeError, match="disk full"):
+        record_turn(game["id"], game, **kwargs)
+
+    assert not conn.in_transaction
+    assert _attempts(conn, game["id"]) == 0
+    assert _times_answered(conn, kwargs["sentence_id"]) == answered
+    assert get_game(game["id"])["version"] == game["version"]
+
+
+def test_stale_state_saves_nothing(conn, turn):
+    game, kwargs = turn
+    record_turn(game["id"], game, **kwargs)
+
+    with pytest.raises(GameStateConflict):
+        record_turn(game["id"], game, **kwargs)
+
+    assert not conn.in_transaction
+    assert _attempts(conn, game["id"]) == 1
+    assert get_game(game["id"])["version"] == game["version"] + 1
+
+
+def test_callers_transaction_decides(conn, turn):
+    game, kwargs = turn
+
+    conn.execute("BEGIN IMMEDIATE")
+    record_turn(game["id"], game, conn=conn, **kwargs)
+    assert conn.in_transaction  # not committed by record_turn
+    conn.rollback()
+
+    assert _attempts(conn, game["id"]) == 0
+    assert get_game(game["id"])["version"] == game["version"]
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from ai import evaluator
+from ai.evaluator import Evaluation, evaluate_translation
+from ai.languagetool import LanguageToolUnavailable
+
+WAITERS = 5
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """A slow fake grading call; set `error` to make it fail. `calls` counts requests."""
+    fake = SimpleNamespace(calls=0, error=None)
+
+    async def parse(**kwargs):
+        fake.calls += 1
+        await asyncio.sleep(0.3)  # long enough for every waiter to join
+        if fake.error is not None:
+            raise fake.error
+        ev = Evaluation(verdict="minor", meaning="same", corrected="Jeg bor i Norge.", short_rule="Husk V2.")
+        return SimpleNamespace(output_parsed=ev, usage=None)
+
+    async def languagetool_down(*args, **kwargs):
+        raise LanguageToolUnavailable("down")
+
+    client = SimpleNamespace(responses=SimpleNamespace(parse=parse))
+    monkeypatch.setattr(evaluator, "_get_openai_client", lambda: client)
+    monkeypatch.setattr(evaluator, "_languagetool_check_cached", languagetool_down)
+    return fake
+
+
+def _evaluate_concurrently(sentence, answer):
+    """Runs WAITERS identical evaluate_translation calls at once; returns (result, error) per call."""
+    start = threading.Barrier(WAITERS)
+
+    def call():
+        start.wait()
+        try:
+            return evaluate_translation(
+                sentence["level"], sentence["english"], answer, sentence_id=sentence["id"], with_source=True
+            ), None
+        except Exception as exc:
+            return None, exc
+
+    with ThreadPoolExecutor(WAITERS) as pool:
+        return list(pool.map(lambda _: call(), range(WAITERS)))
+
+
+def test_waiters_get_the_leaders_result(llm, sentence):
+    outcomes = _evaluate_concurrently(sentence, f"Jeg bor i Norge {uuid.uuid4().hex}")
+
+    assert llm.calls == 1
+    assert [error for _, error in outcomes] == [None] * WAITERS
+    results = [result for result, _ in outcomes]
+    assert sorted(source for _, _, source in results) == ["coalesced"] * (WAITERS - 1) + ["llm"]
+    assert len({feedback_id for _, feedback_id, _ in results}) == 1
+    assert len({ev.corrected for ev, _, _ in results}) == 1
+
+
+def test_waiters_get_the_leaders_error(llm, sentence):
+    llm.error = RuntimeError("grading failed")
+    outcomes = _evaluate_concurrently(sentence, f"Jeg bor i Norge {uuid.uuid4().hex}")
+
+    assert llm.calls == 1
+    assert [result for result, _ in outcomes] == [None] * WAITERS
+    assert all(isinstance(error, RuntimeError) and str(error) == "grading failed" for _, error in outcomes)
+    assert evaluator.singleflight_stats()["in_flight"] == 0
+
+
+def test_next_request_after_a_failure_evaluates_again(llm, sentence):
+    answer = f"Jeg bor i Norge {uuid.uuid4().hex}"
+    llm.error = RuntimeError("grading failed")
+    with pytest.raises(RuntimeError):
+        evaluate_translation(sentence["level"], sentence["english"], answer, sentence_id=sentence["id"])
+
+    llm.error = None
+    ev, feedback_id = evaluate_translation(sentence["level"], sentence["english"], answer, sentence_id=sentence["id"])
+    assert llm.calls == 2
+    assert feedback_id is not None